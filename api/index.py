@@ -4,6 +4,7 @@
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault('POKETRADER_LAZY_INIT', '1')
 from app import create_app
 
 app = create_app()
@@ -1,32 +1,46 @@
 # Application factory pattern for Flask app initialization and configuration
 # Flask, Flask-SQLAlchemy, Flask-Migrate, Flask-Login, Flask-Bcrypt, Flask-WTF
 
+import os
 from flask import Flask
 from config import Config
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
+from jinja2 import FileSystemBytecodeCache
 from flask_login import LoginManager
 from flask_bcrypt import Bcrypt
 from flask_wtf.csrf import CSRFProtect
 
 db = SQLAlchemy()
-migrate = Migrate()
 bcrypt = Bcrypt()
 csrf = CSRFProtect()
 login_manager = LoginManager()
 login_manager.login_view = 'auth.login'
 login_manager.login_message_category = 'info'
 
+def _enable_template_cache(app):
+    cache_dir = app.config.get('JINJA_CACHE_DIR')
+    if not cache_dir:
+        return
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+    except OSError:
+        return
+    app.jinja_options = {**app.jinja_options, 'bytecode_cache': FileSystemBytecodeCache(cache_dir)}
+
 def create_app(config_class=Config):
     app = Flask(__name__)
     app.config.from_object(config_class)
+    _enable_template_cache(app)
     db.init_app(app)
-    migrate.init_app(app, db)
+    if not app.config.get('LAZY_INIT'):
+        from flask_migrate import Migrate
+        Migrate(app, db)
     bcrypt.init_app(app)
     csrf.init_app(app)
     login_manager.init_app(app)
     
     from app import models
+    from app import identity
 
     from app.auth import bp as auth_bp
     app.register_blueprint(auth_bp, url_prefix='/auth')
@@ -34,4 +48,11 @@ def create_app(config_class=Config):
     from app.routes import bp as main_bp
     app.register_blueprint(main_bp)
 
+    from app.pricing import start_price_materializer
+    start_price_materializer(app)
+
+    from app.routes import cache_warmer
+    from app.cache_warmer import start_cache_warmer
+    start_cache_warmer(app, cache_warmer)
+
     return app
@@ -5,6 +5,7 @@ import re
 from flask import Blueprint, render_template, redirect, url_for, flash, request
 from app import db, bcrypt
 from app.models import User
+from app.passwords import HashingBusy
 from flask_login import login_user, current_user, logout_user, login_required
 from urllib.parse import urlparse
 
@@ -72,7 +73,11 @@ def register():
             return redirect(url_for('auth.login'))
             
         new_user = User(username=username, email=email, balance=1000)
-        new_user.set_password(password)
+        try:
+            new_user.set_password(password)
+        except HashingBusy:
+            flash('The server is busy right now. Please try again in a moment.', 'warning')
+            return render_template('auth/register.html', title='Register'), 503
         
         db.session.add(new_user)
         db.session.commit()
@@ -94,7 +99,19 @@ def login():
         
         user = User.query.filter_by(email=email).first()
         
-        if user and user.check_password(password):
+        try:
+            authenticated = user is not None and user.check_password(password)
+        except HashingBusy:
+            flash('The server is busy right now. Please try again in a moment.', 'warning')
+            return render_template('auth/login.html', title='Login'), 503
+
+        if authenticated:
+            if user.password_needs_rehash():
+                try:
+                    user.set_password(password)
+                    db.session.commit()
+                except HashingBusy:
+                    db.session.rollback()
             login_user(user, remember=remember)
             next_page = request.args.get('next')
             if next_page and is_safe_url(next_page):
@@ -0,0 +1,194 @@
+# Search-cache warmer refreshing common and trending queries on a schedule within the upstream rate budget
+# threading, collections
+
+import os
+import threading
+import time
+from collections import Counter
+
+from app.tcg_api import RateLimitExceeded
+
+
+class QueryTracker:
+
+    def __init__(self, max_tracked=1000):
+        self.max_tracked = max_tracked
+        self.lookups = 0
+        self.hits = 0
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, query, hit):
+
+        query = query.strip().lower()
+        if len(query) < 2:
+            return
+        with self._lock:
+            self._counts[query] += 1
+            self.lookups += 1
+            if hit:
+                self.hits += 1
+            if len(self._counts) > self.max_tracked * 2:
+                self._counts = Counter(dict(self._counts.most_common(self.max_tracked)))
+
+    def top(self, n):
+
+        with self._lock:
+            return [query for query, _ in self._counts.most_common(n)]
+
+    def snapshot(self):
+
+        with self._lock:
+            return self.lookups, self.hits
+
+
+class CacheWarmer:
+
+    def __init__(self, cache, refresh, base_queries, tracker, limiter, skip=None, lease=None,
+                 top_n=20, interval_seconds=3600, budget_share=0.5, tokens_per_query=2):
+        self.cache = cache
+        self.refresh = refresh
+        self.base_queries = base_queries
+        self.tracker = tracker
+        self.limiter = limiter
+        self.skip = skip or (lambda query: False)
+        self.lease = lease
+        self.top_n = top_n
+        self.interval_seconds = interval_seconds
+        self.budget_share = budget_share
+        self.tokens_per_query = tokens_per_query
+        self.runs = 0
+        self.last_report = None
+        self.leader = None
+        self._last_counts = (0, 0)
+        self._wake = threading.Event()
+        self._thread = None
+        self._running = threading.Lock()
+
+    def spacing_seconds(self):
+
+        refill_rate = max(self.limiter.refill_rate * self.budget_share, 1e-6)
+        return self.tokens_per_query / refill_rate
+
+    def candidates(self):
+
+        queries = [query.lower() for query in self.base_queries] + self.tracker.top(self.top_n)
+        return [query for query in dict.fromkeys(queries) if not self.skip(query)]
+
+    def _needs_refresh(self, query):
+
+        age = self.cache.age(query)
+        if age is None:
+            return True
+        return age.total_seconds() >= self.cache.soft_max_age.total_seconds() - self.interval_seconds
+
+    def warm_once(self, sleep=time.sleep):
+
+        with self._running:
+            return self._warm(sleep)
+
+    def _warm(self, sleep=time.sleep):
+
+        started = time.monotonic()
+        lookups, hits = self.tracker.snapshot()
+        last_lookups, last_hits = self._last_counts
+        self._last_counts = (lookups, hits)
+
+        report = {
+            'candidates': 0,
+            'refreshed': 0,
+            'fresh': 0,
+            'failed': 0,
+            'rate_limited': 0,
+            'lookups_since_last_run': lookups - last_lookups,
+            'hit_ratio_since_last_run': round((hits - last_hits) / (lookups - last_lookups), 3) if lookups > last_lookups else None,
+            'hit_ratio_total': round(hits / lookups, 3) if lookups else None
+        }
+
+        candidates = self.candidates()
+        report['candidates'] = len(candidates)
+        spacing = self.spacing_seconds()
+        first = True
+        for query in candidates:
+            if not self._needs_refresh(query):
+                report['fresh'] += 1
+                continue
+            if not first:
+                sleep(spacing)
+            first = False
+            try:
+                self.refresh(query)
+                report['refreshed'] += 1
+            except RateLimitExceeded:
+                report['rate_limited'] += 1
+            except Exception:
+                report['failed'] += 1
+
+        report['seconds'] = round(time.monotonic() - started, 1)
+        self.runs += 1
+        self.last_report = report
+        return report
+
+    def start(self, app):
+
+        if self._thread is not None:
+            return self._thread
+
+        def run():
+            forced = False
+            while True:
+                self.leader = self.lease is None or self.lease.try_acquire()
+                if self.leader or forced:
+                    try:
+                        with app.app_context():
+                            report = self.warm_once()
+                        app.logger.info('Warmed search cache: %s', report)
+                    except Exception:
+                        app.logger.exception('Search cache warm-up failed')
+                forced = self._wake.wait(self.interval_seconds)
+                self._wake.clear()
+
+        self._thread = threading.Thread(target=run, name='cache-warmer', daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def trigger(self, app):
+
+        if not self._running.acquire(blocking=False):
+            return False
+        if self._thread is not None:
+            self._running.release()
+            self._wake.set()
+            return True
+
+        def run_once():
+            try:
+                with app.app_context():
+                    self._warm()
+            finally:
+                self._running.release()
+
+        threading.Thread(target=run_once, name='cache-warmer-once', daemon=True).start()
+        return True
+
+    def stats(self):
+
+        lookups, hits = self.tracker.snapshot()
+        return {
+            'scheduled': self._thread is not None,
+            'running': self._running.locked(),
+            'leader': self.leader,
+            'runs': self.runs,
+            'interval_seconds': self.interval_seconds,
+            'spacing_seconds': round(self.spacing_seconds(), 2),
+            'trending': self.tracker.top(10),
+            'hit_ratio_total': round(hits / lookups, 3) if lookups else None,
+            'last_report': self.last_report
+        }
+
+
+def start_cache_warmer(app, warmer):
+
+    if not os.environ.get('POKETRADER_WARM_CACHE'):
+        return None
+    return warmer.start(app)
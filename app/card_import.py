@@ -0,0 +1,190 @@
+# Bulk card import pipeline with bounded parallel fetches, a shared rate budget, batched inserts, and resumable checkpoints
+# concurrent.futures, requests, Flask-SQLAlchemy
+
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+from app import db
+from app.catalog import insert_new_cards
+from app.tcg_api import api_rate_limiter, fetch_cards, RateLimitExceeded
+
+IMPORT_WORKERS = int(os.environ.get('POKETRADER_IMPORT_WORKERS', 4))
+IMPORT_BATCH_SIZE = int(os.environ.get('POKETRADER_IMPORT_BATCH_SIZE', 500))
+MAX_ATTEMPTS = 3
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class ImportCheckpoint:
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.done = self._load()
+
+    def _load(self):
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return set(json.load(f).get('done', []))
+        except (OSError, ValueError, AttributeError):
+            return set()
+
+    def mark(self, names):
+
+        self.done.update(names)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'done': sorted(self.done)}, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+
+        self.done = set()
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _percentile(values, percent):
+
+    if not values:
+        return 0.0
+    rank = max(0, min(len(values) - 1, int(round(percent / 100 * len(values))) - 1))
+    return values[rank]
+
+def _timed_fetch(query, max_cards, limiter, acquire_timeout, latencies):
+
+    if not limiter.acquire(timeout=acquire_timeout):
+        raise RateLimitExceeded(query)
+    started = time.perf_counter()
+    try:
+        return fetch_cards(query, max_cards, timeout=60)
+    finally:
+        latencies.append(time.perf_counter() - started)
+
+def _fetch_pokemon(name, max_cards, limiter, acquire_timeout, retry_delay, latencies):
+
+    import requests
+
+    result = {'name': name, 'status': 'failed', 'cards': [], 'imported': 0, 'skipped': 0}
+    for attempt in range(MAX_ATTEMPTS):
+        try:
+            cards = _timed_fetch(f'name:"{name}"', max_cards, limiter, acquire_timeout, latencies)
+            if not cards:
+                cards = _timed_fetch(f'name:{name}*', max_cards, limiter, acquire_timeout, latencies)
+            result['cards'] = cards
+            result['status'] = 'success'
+            return result
+        except RateLimitExceeded:
+            result['status'] = 'rate_limited'
+            return result
+        except requests.exceptions.HTTPError as e:
+            status_code = e.response.status_code if e.response is not None else 0
+            if status_code == 404:
+                result['status'] = 'not_found'
+                return result
+            if status_code not in RETRYABLE_STATUS:
+                result['status'] = f'http_error_{status_code}'
+                return result
+            result['status'] = 'gateway_timeout' if status_code == 504 else f'http_error_{status_code}'
+        except requests.exceptions.Timeout:
+            result['status'] = 'timeout'
+        except requests.exceptions.ConnectionError:
+            result['status'] = 'connection_error'
+        except Exception as e:
+            result['status'] = f'error: {str(e)[:50]}'
+            return result
+        if attempt < MAX_ATTEMPTS - 1:
+            time.sleep(retry_delay * (attempt + 1))
+    return result
+
+def run_import(names, max_cards=10, workers=IMPORT_WORKERS, batch_size=IMPORT_BATCH_SIZE,
+               checkpoint=None, limiter=None, acquire_timeout=120, retry_delay=5,
+               log=None, on_batch=None):
+
+    limiter = limiter or api_rate_limiter
+    log = log or (lambda result: None)
+    names = list(dict.fromkeys(name for name in names if name))
+    pending = [name for name in names if checkpoint is None or name not in checkpoint.done]
+
+    report = {
+        'imported': 0,
+        'skipped': 0,
+        'failed': 0,
+        'resumed': len(names) - len(pending),
+        'pokemon_processed': []
+    }
+    latencies = []
+    batch_results = []
+    batch_cards = []
+
+    def flush():
+
+        if not batch_results:
+            return
+        try:
+            inserted = insert_new_cards(batch_cards)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        for result in batch_results:
+            card_ids = {card.get('id') for card in result['cards'] if card.get('id')}
+            result['imported'] = len(card_ids & inserted)
+            result['skipped'] = len(card_ids) - result['imported']
+            inserted -= card_ids
+            report['imported'] += result['imported']
+            report['skipped'] += result['skipped']
+            log(result)
+        if on_batch is not None:
+            on_batch(batch_cards)
+        if checkpoint is not None:
+            checkpoint.mark(result['name'] for result in batch_results)
+        batch_results.clear()
+        batch_cards.clear()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='card-import') as executor:
+        futures = [
+            executor.submit(_fetch_pokemon, name, max_cards, limiter, acquire_timeout, retry_delay, latencies)
+            for name in pending
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            report['pokemon_processed'].append(result)
+            if result['status'] == 'success':
+                batch_results.append(result)
+                batch_cards.extend(result['cards'])
+                if len(batch_cards) >= batch_size:
+                    flush()
+                continue
+            if result['status'] == 'not_found':
+                if checkpoint is not None:
+                    checkpoint.mark([result['name']])
+            else:
+                report['failed'] += 1
+            log(result)
+        flush()
+    elapsed = time.perf_counter() - started
+
+    for result in report['pokemon_processed']:
+        result.pop('cards', None)
+
+    latencies.sort()
+    fetched = report['imported'] + report['skipped']
+    report.update({
+        'requests': len(latencies),
+        'seconds': round(elapsed, 3),
+        'cards_per_second': round(fetched / elapsed, 1) if elapsed else 0.0,
+        'latency_ms': {
+            'p50': round(_percentile(latencies, 50) * 1000, 1),
+            'p90': round(_percentile(latencies, 90) * 1000, 1),
+            'p99': round(_percentile(latencies, 99) * 1000, 1),
+            'max': round(latencies[-1] * 1000, 1) if latencies else 0.0
+        }
+    })
+    return report
@@ -0,0 +1,236 @@
+# Card catalog upserts and the incremental, per-set checkpointed mirror of the upstream catalog
+# Flask-SQLAlchemy, SQLAlchemy, requests
+
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy.exc import SQLAlchemyError
+
+from app import db
+from app.models import Card, CatalogSet
+from app.tcg_api import (
+    api_rate_limiter, fetch_sets, fetch_set_cards_page, RateLimitExceeded, CATALOG_PAGE_SIZE
+)
+
+CATALOG_COLUMNS = ('name', 'set_name', 'image_url_small', 'image_url_large')
+MIRROR_STATUS_TTL = 60
+
+_mirror_status = {'checked_at': None, 'complete': False}
+_mirror_status_lock = threading.Lock()
+
+def card_row(card_data):
+
+    api_card_id = card_data.get('id')
+    name = card_data.get('name')
+    if not api_card_id or not name:
+        return None
+    images = card_data.get('images') or {}
+    set_data = card_data.get('set') or {}
+    return {
+        'api_card_id': api_card_id,
+        'name': name[:100],
+        'set_name': (set_data.get('name') or '')[:100],
+        'image_url_small': images.get('small') or '',
+        'image_url_large': images.get('large') or images.get('small') or ''
+    }
+
+def _card_rows(cards):
+
+    rows = {}
+    for card_data in cards:
+        row = card_row(card_data) if isinstance(card_data, dict) else None
+        if row is not None:
+            rows[row['api_card_id']] = row
+    return list(rows.values())
+
+def _dialect_insert():
+
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+        return insert
+    if dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+        return insert
+    return None
+
+def upsert_cards(cards):
+
+    rows = _card_rows(cards)
+    if not rows:
+        return 0
+
+    insert = _dialect_insert()
+    if insert is None:
+        existing = {
+            card.api_card_id: card
+            for card in Card.query.filter(Card.api_card_id.in_([row['api_card_id'] for row in rows]))
+        }
+        for row in rows:
+            card = existing.get(row['api_card_id'])
+            if card is None:
+                db.session.add(Card(**row))
+            else:
+                for column in CATALOG_COLUMNS:
+                    setattr(card, column, row[column])
+        db.session.flush()
+        return len(rows)
+
+    statement = insert(Card)
+    excluded = statement.excluded
+    statement = statement.on_conflict_do_update(
+        index_elements=[Card.api_card_id],
+        set_={column: excluded[column] for column in CATALOG_COLUMNS},
+        where=db.or_(*(
+            getattr(Card, column).is_distinct_from(excluded[column])
+            for column in CATALOG_COLUMNS
+        ))
+    )
+    db.session.execute(statement, rows)
+    return len(rows)
+
+def insert_new_cards(cards):
+
+    rows = _card_rows(cards)
+    if not rows:
+        return set()
+
+    insert = _dialect_insert()
+    if insert is None:
+        existing = {
+            row[0] for row in db.session.query(Card.api_card_id)
+            .filter(Card.api_card_id.in_([row['api_card_id'] for row in rows]))
+        }
+        new_rows = [row for row in rows if row['api_card_id'] not in existing]
+        if new_rows:
+            db.session.execute(db.insert(Card), new_rows)
+        return {row['api_card_id'] for row in new_rows}
+
+    statement = (
+        insert(Card)
+        .on_conflict_do_nothing(index_elements=[Card.api_card_id])
+        .returning(Card.api_card_id)
+    )
+    return {row[0] for row in db.session.execute(statement, rows)}
+
+def _acquire(limiter, timeout):
+
+    if not limiter.acquire(timeout=timeout):
+        raise RateLimitExceeded('catalog sync')
+
+def _sync_set(checkpoint, limiter, acquire_timeout, report):
+
+    page = checkpoint.pages_synced + 1
+    while True:
+        _acquire(limiter, acquire_timeout)
+        cards, total_count = fetch_set_cards_page(checkpoint.id, page)
+        report['requests'] += 1
+        report['cards_upserted'] += upsert_cards(cards)
+
+        checkpoint.pages_synced = page
+        checkpoint.cards_synced += len(cards)
+        done = not cards or page * CATALOG_PAGE_SIZE >= total_count
+        if done:
+            checkpoint.complete = True
+            checkpoint.synced_at = datetime.now()
+        db.session.commit()
+        if done:
+            return
+        page += 1
+
+def sync_catalog(full=False, set_ids=None, limiter=None, acquire_timeout=120, log=None):
+
+    import requests
+
+    limiter = limiter or api_rate_limiter
+    log = log or (lambda message: None)
+    report = {
+        'sets_total': 0,
+        'sets_synced': 0,
+        'sets_skipped': 0,
+        'sets_failed': 0,
+        'cards_upserted': 0,
+        'requests': 0
+    }
+
+    _acquire(limiter, acquire_timeout)
+    upstream_sets = fetch_sets()
+    report['requests'] += 1
+    checkpoints = {checkpoint.id: checkpoint for checkpoint in CatalogSet.query.all()}
+    wanted = set(set_ids) if set_ids else None
+    if wanted is None:
+        _record_listing(upstream_sets, checkpoints)
+
+    for set_data in upstream_sets:
+        set_id = set_data.get('id')
+        if not set_id or (wanted is not None and set_id not in wanted):
+            continue
+        report['sets_total'] += 1
+
+        checkpoint = checkpoints.get(set_id)
+        if checkpoint is None:
+            checkpoint = CatalogSet(id=set_id, pages_synced=0, cards_synced=0, complete=False)
+            db.session.add(checkpoint)
+        updated_at = set_data.get('updatedAt')
+        if full or checkpoint.upstream_updated_at != updated_at:
+            checkpoint.upstream_updated_at = updated_at
+            checkpoint.pages_synced = 0
+            checkpoint.cards_synced = 0
+            checkpoint.complete = False
+        checkpoint.name = (set_data.get('name') or '')[:100]
+        checkpoint.total = set_data.get('total') or 0
+        db.session.commit()
+
+        if checkpoint.complete:
+            report['sets_skipped'] += 1
+            continue
+
+        try:
+            _sync_set(checkpoint, limiter, acquire_timeout, report)
+            report['sets_synced'] += 1
+            log(f'{set_id}: {checkpoint.cards_synced} cards')
+        except (RateLimitExceeded, requests.exceptions.RequestException) as e:
+            db.session.rollback()
+            report['sets_failed'] += 1
+            log(f'{set_id}: stopped after page {checkpoint.pages_synced} ({e})')
+
+    invalidate_mirror_status()
+    return report
+
+def _record_listing(upstream_sets, checkpoints):
+
+    listed = {set_data.get('id') for set_data in upstream_sets if set_data.get('id')}
+    for set_id in listed:
+        if set_id not in checkpoints:
+            checkpoints[set_id] = CatalogSet(id=set_id, pages_synced=0, cards_synced=0, complete=False)
+            db.session.add(checkpoints[set_id])
+    for set_id, checkpoint in checkpoints.items():
+        checkpoint.listed = set_id in listed
+    db.session.commit()
+
+def invalidate_mirror_status():
+
+    with _mirror_status_lock:
+        _mirror_status['checked_at'] = None
+
+def catalog_mirror_complete():
+
+    checked_at = _mirror_status['checked_at']
+    if checked_at is not None and time.monotonic() - checked_at < MIRROR_STATUS_TTL:
+        return _mirror_status['complete']
+
+    try:
+        listed, incomplete = db.session.query(
+            db.func.count(CatalogSet.id),
+            db.func.sum(db.case((CatalogSet.complete, 0), else_=1))
+        ).filter(CatalogSet.listed.is_(True)).one()
+        complete = listed > 0 and not incomplete
+    except SQLAlchemyError:
+        db.session.rollback()
+        complete = False
+
+    with _mirror_status_lock:
+        _mirror_status['checked_at'] = time.monotonic()
+        _mirror_status['complete'] = complete
+    return complete
@@ -0,0 +1,141 @@
+# Offline catalog import streaming pokemon-tcg-data JSON dumps into the Card table in batched upserts
+# json, Flask-SQLAlchemy
+
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+
+from app import db
+from app.catalog import upsert_cards, invalidate_mirror_status
+from app.models import CatalogSet
+
+DUMP_BATCH_SIZE = 2000
+READ_CHUNK_SIZE = 64 * 1024
+WHITESPACE = ' \t\r\n'
+
+_decoder = json.JSONDecoder()
+
+def iter_json_array(f, chunk_size=READ_CHUNK_SIZE):
+
+    buffer = ''
+    position = 0
+    started = False
+    eof = False
+
+    while True:
+        while position < len(buffer) and buffer[position] in WHITESPACE:
+            position += 1
+
+        if position >= len(buffer):
+            if eof:
+                raise ValueError('unexpected end of JSON array')
+            buffer = f.read(chunk_size)
+            position = 0
+            eof = not buffer
+            continue
+
+        token = buffer[position]
+        if not started:
+            if token != '[':
+                raise ValueError('expected a JSON array of cards')
+            started = True
+            position += 1
+            continue
+        if token == ']':
+            return
+        if token == ',':
+            position += 1
+            continue
+
+        try:
+            item, end = _decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        if end == len(buffer) and not eof:
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+
+        yield item
+        position = end
+
+def _load_sets(path):
+
+    if path is None or not path.exists():
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return {set_data['id']: set_data for set_data in iter_json_array(f) if set_data.get('id')}
+
+def find_dump_files(root, language='en'):
+
+    root = Path(root)
+    if root.is_file():
+        return [root], root.parent.parent.parent / 'sets' / f'{language}.json'
+    if (root / 'cards').is_dir():
+        return sorted((root / 'cards' / language).glob('*.json')), root / 'sets' / f'{language}.json'
+    return sorted(root.glob('*.json')), root.parent.parent / 'sets' / f'{language}.json'
+
+def _checkpoint_set(set_data, card_count):
+
+    checkpoint = db.session.get(CatalogSet, set_data['id'])
+    if checkpoint is None:
+        checkpoint = CatalogSet(id=set_data['id'])
+        db.session.add(checkpoint)
+    checkpoint.name = (set_data.get('name') or '')[:100]
+    checkpoint.total = set_data.get('total') or card_count
+    checkpoint.upstream_updated_at = set_data.get('updatedAt')
+    checkpoint.pages_synced = 0
+    checkpoint.cards_synced = card_count
+    checkpoint.complete = True
+    checkpoint.synced_at = datetime.now()
+
+def import_dump(root, language='en', batch_size=DUMP_BATCH_SIZE, log=None):
+
+    log = log or (lambda message: None)
+    card_files, sets_path = find_dump_files(root, language)
+    sets = _load_sets(sets_path)
+    report = {'files': 0, 'cards': 0, 'upserted': 0, 'sets_checkpointed': 0}
+
+    started = time.perf_counter()
+    batch = []
+    for path in card_files:
+        set_data = sets.get(path.stem)
+        card_count = 0
+        with open(path, 'r', encoding='utf-8') as f:
+            for card_data in iter_json_array(f):
+                if not isinstance(card_data, dict):
+                    continue
+                if 'set' not in card_data and set_data is not None:
+                    card_data['set'] = {'id': set_data['id'], 'name': set_data.get('name')}
+                batch.append(card_data)
+                card_count += 1
+                if len(batch) >= batch_size:
+                    report['upserted'] += upsert_cards(batch)
+                    db.session.commit()
+                    batch = []
+
+        report['upserted'] += upsert_cards(batch)
+        batch = []
+        if set_data is not None and set_data.get('updatedAt'):
+            _checkpoint_set(set_data, card_count)
+            report['sets_checkpointed'] += 1
+        db.session.commit()
+
+        report['files'] += 1
+        report['cards'] += card_count
+        log(f'{path.name}: {card_count} cards')
+
+    invalidate_mirror_status()
+    elapsed = time.perf_counter() - started
+    report['seconds'] = round(elapsed, 3)
+    report['cards_per_second'] = round(report['cards'] / elapsed, 1) if elapsed else 0.0
+    return report
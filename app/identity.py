@@ -0,0 +1,157 @@
+# Request-scoped user identity backed by a short-lived cache of immutable profile fields
+# Flask-Login, Flask-SQLAlchemy, threading
+
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from flask import abort
+from flask_login import UserMixin, logout_user
+
+from app import db, login_manager
+from app.models import User
+from app.search_cache import atomic_write
+
+IDENTITY_TTL = int(os.environ.get('POKETRADER_IDENTITY_TTL', 60))
+IDENTITY_CACHE_MAX = 10000
+IDENTITY_EPOCH_FILE = Path(os.environ.get(
+    'POKETRADER_IDENTITY_EPOCH_FILE',
+    Path(tempfile.gettempdir()) / 'poketrader_identity_epoch'
+))
+
+ADMIN_USERS = set(
+    user.strip().lower()
+    for user in os.environ.get('ADMIN_USERS', '').split(',')
+    if user.strip()
+)
+
+def admin_for(username, email):
+
+    return email.lower() in ADMIN_USERS or username.lower() in ADMIN_USERS
+
+
+class UserIdentity(UserMixin):
+
+    def __init__(self, id, username, email, is_admin, record=None):
+        self.id = id
+        self.username = username
+        self.email = email
+        self.is_admin = is_admin
+        self._record = record
+
+    @property
+    def record(self):
+
+        if self._record is None:
+            self._record = db.session.get(User, self.id)
+            if self._record is None:
+                identity_cache.invalidate(self.id)
+                logout_user()
+                abort(login_manager.unauthorized())
+        return self._record
+
+    @property
+    def balance(self):
+
+        return self.record.balance
+
+    @balance.setter
+    def balance(self, value):
+
+        self.record.balance = value
+
+    def __repr__(self):
+        return f'<UserIdentity {self.username}>'
+
+
+class IdentityCache:
+
+    def __init__(self, ttl_seconds=IDENTITY_TTL, max_entries=IDENTITY_CACHE_MAX, epoch_file=IDENTITY_EPOCH_FILE):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.epoch_file = Path(epoch_file)
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._epoch = self._read_epoch()
+        self._lock = threading.Lock()
+
+    def _read_epoch(self):
+
+        try:
+            return self.epoch_file.stat().st_mtime_ns
+        except OSError:
+            return None
+
+    def get(self, user_id):
+
+        epoch = self._read_epoch()
+        with self._lock:
+            if epoch != self._epoch:
+                self._entries.clear()
+                self._epoch = epoch
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] <= time.monotonic():
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[1]
+
+    def put(self, user):
+
+        fields = (user.username, user.email, admin_for(user.username, user.email))
+        now = time.monotonic()
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._entries = {
+                    user_id: entry for user_id, entry in self._entries.items()
+                    if entry[0] > now
+                }
+                if len(self._entries) >= self.max_entries:
+                    self._entries.clear()
+            self._entries[user.id] = (now + self.ttl_seconds, fields)
+        return fields
+
+    def invalidate(self, user_id):
+
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+
+        try:
+            atomic_write(self.epoch_file, str(time.time()).encode('utf-8'))
+        except OSError:
+            pass
+        with self._lock:
+            self._entries.clear()
+            self._epoch = self._read_epoch()
+
+    def stats(self):
+
+        with self._lock:
+            size = len(self._entries)
+        return {'entries': size, 'hits': self.hits, 'misses': self.misses, 'ttl_seconds': self.ttl_seconds}
+
+
+identity_cache = IdentityCache()
+
+@login_manager.user_loader
+def load_user(user_id):
+
+    try:
+        user_id = int(user_id)
+    except (TypeError, ValueError):
+        return None
+
+    fields = identity_cache.get(user_id)
+    if fields is not None:
+        return UserIdentity(user_id, *fields)
+
+    user = db.session.get(User, user_id)
+    if user is None:
+        identity_cache.invalidate(user_id)
+        return None
+    return UserIdentity(user_id, *identity_cache.put(user), record=user)
@@ -0,0 +1,208 @@
+# Card image proxy storing upstream images once under content hashes and serving right-sized thumbnails
+# requests, Pillow (optional), hashlib
+
+import base64
+import binascii
+import hashlib
+import io
+import json
+import os
+import threading
+from urllib.parse import urlsplit
+
+from app.search_cache import atomic_write, file_entries, evict_to_budget
+from app.tcg_api import get_api_session, SingleFlight
+
+IMAGE_SIZES = {'xs': 96, 'sm': 245, 'md': 400}
+MAX_IMAGE_BYTES = 5 * 1024 * 1024
+IMAGE_CACHE_MAX_BYTES = 128 * 1024 * 1024
+THUMBNAIL_QUALITY = 80
+
+_pil_image = None
+_pil_checked = False
+
+
+class ImageUnavailable(Exception):
+    pass
+
+
+def _image_module():
+
+    global _pil_image, _pil_checked
+    if not _pil_checked:
+        try:
+            from PIL import Image
+            _pil_image = Image
+        except ImportError:
+            _pil_image = None
+        _pil_checked = True
+    return _pil_image
+
+
+class CardImageStore:
+
+    def __init__(self, cache_dir, allowed_hosts, timeout=10, max_bytes=IMAGE_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.allowed_hosts = {host.lower() for host in allowed_hosts}
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.fetches = 0
+        self.thumbnails = 0
+        self.evictions = 0
+        self._fetches = SingleFlight()
+        self._bytes = None
+        self._lock = threading.Lock()
+
+    def is_allowed(self, url):
+
+        if not url:
+            return False
+        parts = urlsplit(url)
+        return parts.scheme in ('http', 'https') and (parts.hostname or '').lower() in self.allowed_hosts
+
+    def token_for(self, url):
+
+        if not self.is_allowed(url):
+            return None
+        return base64.urlsafe_b64encode(url.encode('utf-8')).decode('ascii').rstrip('=')
+
+    def url_for_token(self, token):
+
+        try:
+            url = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)).decode('utf-8')
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            return None
+        return url if self.is_allowed(url) else None
+
+    def _ref_path(self, url):
+
+        url_hash = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return self.cache_dir / 'refs' / url_hash[:2] / f'{url_hash}.json'
+
+    def _blob_path(self, content_hash):
+
+        return self.cache_dir / 'blobs' / content_hash[:2] / content_hash
+
+    def _variant_path(self, content_hash, size):
+
+        return self.cache_dir / 'variants' / content_hash[:2] / f'{content_hash}-{size}.webp'
+
+    def _entries(self):
+
+        return file_entries(self.cache_dir, '*/*/*')
+
+    def _write(self, path, payload):
+
+        atomic_write(path, payload)
+        with self._lock:
+            if self._bytes is None:
+                self._bytes = sum(size for _, size, _ in self._entries())
+            else:
+                self._bytes += len(payload)
+            over_budget = self._bytes > self.max_bytes
+        if over_budget:
+            self.evict()
+
+    def evict(self):
+
+        with self._lock:
+            self._bytes, evicted = evict_to_budget(self._entries(), self.max_bytes)
+            self.evictions += evicted
+
+    def _touch(self, path):
+
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _read_ref(self, url):
+
+        try:
+            with open(self._ref_path(url), 'r', encoding='utf-8') as f:
+                ref = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not self._blob_path(ref.get('hash', '')).exists():
+            return None
+        return ref
+
+    def _fetch(self, url):
+
+        import requests
+
+        ref = self._read_ref(url)
+        if ref is not None:
+            return ref
+
+        try:
+            with get_api_session().get(url, timeout=self.timeout, stream=True) as response:
+                response.raise_for_status()
+                payload = response.raw.read(MAX_IMAGE_BYTES + 1, decode_content=True)
+                content_type = response.headers.get('Content-Type', 'image/png').split(';')[0].strip()
+        except requests.exceptions.RequestException as e:
+            raise ImageUnavailable(url) from e
+        if len(payload) > MAX_IMAGE_BYTES or not content_type.startswith('image/'):
+            raise ImageUnavailable(url)
+
+        self.fetches += 1
+        content_hash = hashlib.sha256(payload).hexdigest()
+        blob_path = self._blob_path(content_hash)
+        if not blob_path.exists():
+            self._write(blob_path, payload)
+        ref = {'hash': content_hash, 'content_type': content_type}
+        self._write(self._ref_path(url), json.dumps(ref).encode('utf-8'))
+        return ref
+
+    def original(self, url):
+
+        ref = self._read_ref(url)
+        if ref is None:
+            ref = self._fetches.do(url, lambda: self._fetch(url))
+        return ref
+
+    def _thumbnail(self, blob_path, variant_path, width):
+
+        with _image_module().open(blob_path) as image:
+            image.thumbnail((width, width * 2))
+            if image.mode not in ('RGB', 'RGBA'):
+                image = image.convert('RGBA')
+            output = io.BytesIO()
+            image.save(output, 'WEBP', quality=THUMBNAIL_QUALITY, method=4)
+        self._write(variant_path, output.getvalue())
+        self.thumbnails += 1
+
+    def variant(self, url, size):
+
+        ref = self.original(url)
+        content_hash = ref['hash']
+        blob_path = self._blob_path(content_hash)
+        width = IMAGE_SIZES.get(size)
+        if width is None:
+            self._touch(blob_path)
+            return blob_path, ref['content_type'], content_hash, True
+        pil_image = _image_module()
+        if pil_image is None:
+            self._touch(blob_path)
+            return blob_path, ref['content_type'], content_hash, False
+
+        variant_path = self._variant_path(content_hash, size)
+        if variant_path.exists():
+            self._touch(variant_path)
+        else:
+            try:
+                self._thumbnail(blob_path, variant_path, width)
+            except (OSError, ValueError, pil_image.DecompressionBombError):
+                return blob_path, ref['content_type'], content_hash, False
+        return variant_path, 'image/webp', f'{content_hash}-{size}', True
+
+    def stats(self):
+
+        return {
+            'fetches': self.fetches,
+            'thumbnails': self.thumbnails,
+            'evictions': self.evictions,
+            'bytes': self._bytes,
+            'max_bytes': self.max_bytes,
+            'resizing': _image_module() is not None
+        }
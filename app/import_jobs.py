@@ -0,0 +1,206 @@
+# Background runner for bulk card imports, persisting progress on ImportJob rows for status polling
+# concurrent.futures, threading, Flask-SQLAlchemy
+
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from app import db
+from app.card_import import run_import, IMPORT_WORKERS, IMPORT_BATCH_SIZE
+from app.models import ImportJob
+
+DONE_STATUSES = ('success', 'not_found')
+RESUMABLE_STATUSES = ('failed',)
+ACTIVE_STATUSES = ('queued', 'running')
+IMPORT_JOB_STALE_SECONDS = int(os.environ.get('POKETRADER_IMPORT_JOB_STALE_SECONDS', 600))
+
+_job_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get('POKETRADER_IMPORT_JOB_WORKERS', 1)),
+    thread_name_prefix='import-job'
+)
+_active_jobs = set()
+_active_jobs_lock = threading.Lock()
+
+
+class JobCheckpoint:
+
+    def __init__(self, job):
+        self.done = {
+            result['name'] for result in (job.results or [])
+            if result.get('status') in DONE_STATUSES
+        }
+
+    def mark(self, names):
+
+        self.done.update(names)
+
+
+def _record_result(job, result):
+
+    job.results = (job.results or []) + [{
+        'name': result['name'],
+        'status': result['status'],
+        'imported': result['imported'],
+        'skipped': result['skipped']
+    }]
+    job.processed = len(job.results)
+    job.imported += result['imported']
+    job.skipped += result['skipped']
+    if result['status'] not in DONE_STATUSES:
+        job.failed += 1
+    job.heartbeat_at = datetime.now()
+    db.session.commit()
+
+def _run_job(app, job_id, token, on_batch):
+
+    with app.app_context():
+        try:
+            now = datetime.now()
+            started = db.session.execute(
+                db.update(ImportJob)
+                .where(ImportJob.id == job_id, ImportJob.claimed_by == token)
+                .values(status='running', started_at=now, finished_at=None, error=None, heartbeat_at=now)
+            )
+            db.session.commit()
+            if started.rowcount != 1:
+                return
+
+            job = db.session.get(ImportJob, job_id)
+            report = run_import(
+                job.pokemon_list,
+                max_cards=job.max_cards,
+                batch_size=min(IMPORT_BATCH_SIZE, job.max_cards * IMPORT_WORKERS),
+                checkpoint=JobCheckpoint(job),
+                log=lambda result: _record_result(job, result),
+                on_batch=on_batch
+            )
+            report.pop('pokemon_processed', None)
+            job.report = report
+            job.status = 'complete'
+            job.finished_at = datetime.now()
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            db.session.execute(
+                db.update(ImportJob)
+                .where(ImportJob.id == job_id, ImportJob.claimed_by == token)
+                .values(status='failed', error=str(e)[:500], finished_at=datetime.now())
+            )
+            db.session.commit()
+        finally:
+            _release_job(job_id)
+            db.session.remove()
+
+def _claim_job(job_id):
+
+    with _active_jobs_lock:
+        if job_id in _active_jobs:
+            return False
+        _active_jobs.add(job_id)
+        return True
+
+def _release_job(job_id):
+
+    with _active_jobs_lock:
+        _active_jobs.discard(job_id)
+
+def _claim_row(job_id):
+
+    token = uuid.uuid4().hex
+    now = datetime.now()
+    stale_before = now - timedelta(seconds=IMPORT_JOB_STALE_SECONDS)
+    claimed = db.session.execute(
+        db.update(ImportJob)
+        .where(
+            ImportJob.id == job_id,
+            db.or_(
+                ImportJob.status.in_(RESUMABLE_STATUSES),
+                db.and_(
+                    ImportJob.status.in_(ACTIVE_STATUSES),
+                    db.or_(ImportJob.heartbeat_at.is_(None), ImportJob.heartbeat_at < stale_before)
+                )
+            )
+        )
+        .values(status='queued', claimed_by=token, heartbeat_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    if claimed.rowcount != 1:
+        db.session.rollback()
+        return None
+    return token
+
+def _start_job(app, job_id, token, on_batch):
+
+    if not _claim_job(job_id):
+        return False
+    _job_executor.submit(_run_job, app, job_id, token, on_batch)
+    return True
+
+def submit_import_job(app, names, max_cards=10, requested_by_id=None, on_batch=None):
+
+    token = uuid.uuid4().hex
+    job = ImportJob(
+        requested_by_id=requested_by_id,
+        status='queued',
+        pokemon_list=list(dict.fromkeys(name for name in names if name)),
+        max_cards=max_cards,
+        results=[],
+        claimed_by=token,
+        heartbeat_at=datetime.now()
+    )
+    db.session.add(job)
+    db.session.commit()
+    _start_job(app, job.id, token, on_batch)
+    return job
+
+def resume_import_job(app, job, on_batch=None):
+
+    if job.status == 'complete' or not _claim_job(job.id):
+        return False
+
+    try:
+        token = _claim_row(job.id)
+        if token is None:
+            _release_job(job.id)
+            db.session.refresh(job)
+            return False
+
+        done = [result for result in (job.results or []) if result.get('status') in DONE_STATUSES]
+        job.results = done
+        job.processed = len(done)
+        job.failed = 0
+        job.status = 'queued'
+        db.session.commit()
+        _job_executor.submit(_run_job, app, job.id, token, on_batch)
+    except Exception:
+        _release_job(job.id)
+        raise
+    return True
+
+def job_status(job):
+
+    elapsed = 0.0
+    if job.started_at is not None:
+        elapsed = ((job.finished_at or datetime.now()) - job.started_at).total_seconds()
+    total = len(job.pokemon_list or [])
+    return {
+        'job_id': job.id,
+        'status': job.status,
+        'total': total,
+        'processed': job.processed,
+        'progress': round(100 * job.processed / total, 1) if total else 100.0,
+        'imported': job.imported,
+        'skipped': job.skipped,
+        'failed': job.failed,
+        'elapsed_seconds': round(elapsed, 1),
+        'cards_per_second': round((job.imported + job.skipped) / elapsed, 1) if elapsed else 0.0,
+        'results': job.results or [],
+        'report': job.report,
+        'error': job.error,
+        'created_at': job.created_at.isoformat() if job.created_at else None,
+        'started_at': job.started_at.isoformat() if job.started_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None,
+        'heartbeat_at': job.heartbeat_at.isoformat() if job.heartbeat_at else None
+    }
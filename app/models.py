@@ -1,14 +1,11 @@
 # Database models for users, cards, collections, and trades using SQLAlchemy
 # Flask-SQLAlchemy, Flask-Login, Flask-Bcrypt
 
-from app import db, login_manager, bcrypt
+from app import db
+from app.passwords import hash_password, verify_password, needs_rehash
 from flask_login import UserMixin
 import enum
 
-@login_manager.user_loader
-def load_user(user_id):
-    return User.query.get(int(user_id))
-
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
@@ -19,10 +16,13 @@ class User(UserMixin, db.Model):
     collection = db.relationship('CollectionItem', back_populates='owner', lazy=True)
     
     def set_password(self, password):
-        self.password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+        self.password_hash = hash_password(password)
 
     def check_password(self, password):
-        return bcrypt.check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        return needs_rehash(self.password_hash)
 
     def __repr__(self):
         return f'<User {self.username}>'
@@ -39,13 +39,34 @@ class Card(db.Model):
 
     owners = db.relationship('CollectionItem', back_populates='card_info', lazy=True)
 
+    __table_args__ = (
+        db.Index(
+            'ix_card_name_lower',
+            db.func.lower(name).label('name_lower'),
+            postgresql_ops={'name_lower': 'varchar_pattern_ops'}
+        ),
+    )
+
+    @staticmethod
+    def name_starts_with(prefix):
+        prefix = (prefix or '').lower()
+        if not prefix:
+            return db.true()
+        escaped = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        name_lower = db.func.lower(Card.name)
+        matches = name_lower.like(f'{escaped}%', escape='\\')
+        if db.engine.dialect.name != 'sqlite':
+            return matches
+        upper_bound = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        return db.and_(name_lower >= prefix, name_lower < upper_bound, matches)
+
     def __repr__(self):
         return f'<Card {self.name} ({self.api_card_id})>'
 
 class CollectionItem(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    card_id = db.Column(db.Integer, db.ForeignKey('card.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    card_id = db.Column(db.Integer, db.ForeignKey('card.id'), nullable=False, index=True)
     
     condition = db.Column(db.String(50), default='Near Mint')
     is_for_trade = db.Column(db.Boolean, default=True, nullable=False)
@@ -81,10 +102,15 @@ class Trade(db.Model):
     offered_cards = db.relationship('OfferedCard', back_populates='trade', lazy=True, foreign_keys='OfferedCard.trade_id')
     requested_cards = db.relationship('RequestedCard', back_populates='trade', lazy=True)
 
+    __table_args__ = (
+        db.Index('ix_trade_proposer_id_status', 'proposer_id', 'status', 'created_at'),
+        db.Index('ix_trade_receiver_id_status', 'receiver_id', 'status', 'created_at'),
+    )
+
 class OfferedCard(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    trade_id = db.Column(db.Integer, db.ForeignKey('trade.id'), nullable=False)
-    collection_item_id = db.Column(db.Integer, db.ForeignKey('collection_item.id'), nullable=False)
+    trade_id = db.Column(db.Integer, db.ForeignKey('trade.id'), nullable=False, index=True)
+    collection_item_id = db.Column(db.Integer, db.ForeignKey('collection_item.id'), nullable=False, index=True)
     offering_user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     
     trade = db.relationship('Trade', back_populates='offered_cards', foreign_keys=[trade_id])
@@ -93,10 +119,58 @@ class OfferedCard(db.Model):
 
 class RequestedCard(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    trade_id = db.Column(db.Integer, db.ForeignKey('trade.id'), nullable=False)
-    collection_item_id = db.Column(db.Integer, db.ForeignKey('collection_item.id'), nullable=False)
+    trade_id = db.Column(db.Integer, db.ForeignKey('trade.id'), nullable=False, index=True)
+    collection_item_id = db.Column(db.Integer, db.ForeignKey('collection_item.id'), nullable=False, index=True)
     requesting_user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     
     trade = db.relationship('Trade', back_populates='requested_cards', foreign_keys=[trade_id])
     collection_item = db.relationship('CollectionItem')
     requesting_user = db.relationship('User')
+
+
+class TradeReservation(db.Model):
+    collection_item_id = db.Column(db.Integer, db.ForeignKey('collection_item.id'), primary_key=True)
+    trade_id = db.Column(db.Integer, db.ForeignKey('trade.id'), nullable=False, index=True)
+
+    trade = db.relationship('Trade')
+    collection_item = db.relationship('CollectionItem')
+
+
+class CatalogSet(db.Model):
+    id = db.Column(db.String(50), primary_key=True)
+    name = db.Column(db.String(100))
+    total = db.Column(db.Integer, default=0, nullable=False)
+    upstream_updated_at = db.Column(db.String(30))
+    pages_synced = db.Column(db.Integer, default=0, nullable=False)
+    cards_synced = db.Column(db.Integer, default=0, nullable=False)
+    complete = db.Column(db.Boolean, default=False, nullable=False)
+    listed = db.Column(db.Boolean, default=False, nullable=False)
+    synced_at = db.Column(db.DateTime, nullable=True)
+
+    def __repr__(self):
+        return f'<CatalogSet {self.id} ({self.pages_synced} pages)>'
+
+
+class ImportJob(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    requested_by_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    status = db.Column(db.String(20), default='queued', nullable=False, index=True)
+    pokemon_list = db.Column(db.JSON, nullable=False)
+    max_cards = db.Column(db.Integer, default=10, nullable=False)
+    processed = db.Column(db.Integer, default=0, nullable=False)
+    imported = db.Column(db.Integer, default=0, nullable=False)
+    skipped = db.Column(db.Integer, default=0, nullable=False)
+    failed = db.Column(db.Integer, default=0, nullable=False)
+    results = db.Column(db.JSON, nullable=True)
+    report = db.Column(db.JSON, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, server_default=db.func.now())
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    claimed_by = db.Column(db.String(32), nullable=True)
+    heartbeat_at = db.Column(db.DateTime, nullable=True)
+
+    requested_by = db.relationship('User')
+
+    def __repr__(self):
+        return f'<ImportJob {self.id} {self.status}>'
@@ -0,0 +1,139 @@
+# Process-wide sorted name index answering card-name prefix and typo-tolerant trigram lookups without a database round trip
+# bisect, threading, collections
+
+import bisect
+import threading
+import time
+from collections import Counter
+
+FUZZY_THRESHOLD = 0.4
+
+def trigrams(text):
+
+    grams = set()
+    for word in text.lower().split():
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+def similarity(grams, other_grams):
+
+    if not grams or not other_grams:
+        return 0.0
+    shared = len(grams & other_grams)
+    return shared / (len(grams) + len(other_grams) - shared)
+
+
+class NamePrefixIndex:
+
+    def __init__(self, loader, max_age_seconds=600):
+        self.loader = loader
+        self.max_age_seconds = max_age_seconds
+        self.version = 0
+        self._keys = []
+        self._names = []
+        self._known = set()
+        self._grams = {}
+        self._loaded_at = None
+        self._lock = threading.Lock()
+
+    def _rebuild(self, names):
+
+        entries = sorted({(name.lower(), name) for name in names if name})
+        keys = [key for key, _ in entries]
+        names = [name for _, name in entries]
+        grams = {}
+        for name in names:
+            for gram in trigrams(name):
+                grams.setdefault(gram, set()).add(name)
+
+        with self._lock:
+            self._keys = keys
+            self._names = names
+            self._known = set(names)
+            self._grams = grams
+            self._loaded_at = time.monotonic()
+            self.version += 1
+
+    def ensure_loaded(self):
+
+        loaded_at = self._loaded_at
+        if loaded_at is not None and time.monotonic() - loaded_at < self.max_age_seconds:
+            return
+        self._rebuild(self.loader())
+
+    def add(self, names):
+
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            changed = False
+            for name in names:
+                if not name or name in self._known:
+                    continue
+                entry = (name.lower(), name)
+                position = self._position(entry)
+                self._keys.insert(position, entry[0])
+                self._names.insert(position, name)
+                self._known.add(name)
+                self._index_grams(name)
+                changed = True
+            if changed:
+                self.version += 1
+
+    def _index_grams(self, name):
+
+        for gram in trigrams(name):
+            self._grams.setdefault(gram, set()).add(name)
+
+    def _position(self, entry):
+
+        key, name = entry
+        low = bisect.bisect_left(self._keys, key)
+        high = bisect.bisect_right(self._keys, key, lo=low)
+        return bisect.bisect_left(self._names, name, lo=low, hi=high)
+
+    def search(self, prefix, limit=15):
+
+        prefix = prefix.lower()
+        with self._lock:
+            keys = self._keys
+            names = self._names
+            start = bisect.bisect_left(keys, prefix)
+            results = []
+            for position in range(start, len(keys)):
+                if not keys[position].startswith(prefix) or len(results) >= limit:
+                    break
+                results.append(names[position])
+        return results
+
+    def fuzzy_search(self, query, limit=5, threshold=FUZZY_THRESHOLD):
+
+        query_grams = trigrams(query)
+        if not query_grams:
+            return []
+
+        with self._lock:
+            shared = Counter()
+            for gram in query_grams:
+                shared.update(self._grams.get(gram, ()))
+
+        word_count = len(query.split())
+        scored = []
+        for name, count in shared.items():
+            if count / len(query_grams) < threshold:
+                continue
+            lead = ' '.join(name.split()[:word_count])
+            score = max(
+                similarity(query_grams, trigrams(lead)),
+                similarity(query_grams, trigrams(name))
+            )
+            if score >= threshold:
+                scored.append((-score, len(name), name))
+        scored.sort()
+        return [name for _, _, name in scored[:limit]]
+
+    def invalidate(self):
+
+        with self._lock:
+            self._loaded_at = None
@@ -0,0 +1,54 @@
+# Password hashing on a bounded executor so bcrypt work cannot starve request threads, with cost-based rehash checks
+# Flask-Bcrypt, concurrent.futures, threading
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+
+from app import bcrypt
+
+HASH_WORKERS = int(os.environ.get('POKETRADER_HASH_WORKERS', max(1, (os.cpu_count() or 2) - 1)))
+HASH_QUEUE = int(os.environ.get('POKETRADER_HASH_QUEUE', 16))
+HASH_WAIT_SECONDS = float(os.environ.get('POKETRADER_HASH_WAIT', 10))
+DEFAULT_LOG_ROUNDS = 12
+
+
+class HashingBusy(Exception):
+    pass
+
+
+_hash_executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix='password-hash')
+_hash_slots = threading.BoundedSemaphore(HASH_WORKERS + HASH_QUEUE)
+
+def _run_bounded(fn, *args):
+
+    if not _hash_slots.acquire(timeout=HASH_WAIT_SECONDS):
+        raise HashingBusy()
+    try:
+        future = _hash_executor.submit(fn, *args)
+    except Exception:
+        _hash_slots.release()
+        raise
+    future.add_done_callback(lambda _: _hash_slots.release())
+    return future.result()
+
+def hash_password(password, rounds=None):
+
+    return _run_bounded(bcrypt.generate_password_hash, password, rounds).decode('utf-8')
+
+def verify_password(password_hash, password):
+
+    return _run_bounded(bcrypt.check_password_hash, password_hash, password)
+
+def hash_cost(password_hash):
+
+    try:
+        return int(password_hash.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+def needs_rehash(password_hash):
+
+    return hash_cost(password_hash) != current_app.config.get('BCRYPT_LOG_ROUNDS', DEFAULT_LOG_ROUNDS)
@@ -0,0 +1,209 @@
+# Deterministic daily card price oracle and optional background price materialization
+# Flask-SQLAlchemy, hashlib, zoneinfo
+
+import hashlib
+import os
+import threading
+import time
+from functools import lru_cache
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+from app import db
+from app.models import Card, CollectionItem
+
+APP_TIMEZONE = ZoneInfo('UTC')
+
+CONDITION_MULTIPLIERS = {
+    'Near Mint': 1.0,
+    'Lightly Played': 0.8,
+    'Moderately Played': 0.64,
+    'Heavily Played': 0.512,
+    'Damaged': 0.4096
+}
+
+CONDITION_PRICE_RATIOS = {
+    'Lightly Played': (8, 10),
+    'Moderately Played': (64, 100),
+    'Heavily Played': (512, 1000),
+    'Damaged': (4096, 10000)
+}
+
+def price_date():
+
+    return datetime.now(APP_TIMEZONE).date()
+
+def _price_key(name, set_name):
+
+    base = (name or 'unknown').lower()
+    if set_name:
+        base += f"|{set_name.lower()}"
+    return base
+
+@lru_cache(maxsize=65536)
+def _stable_price_seed(name, set_name=None):
+
+    digest = hashlib.sha256(_price_key(name, set_name).encode('utf-8')).hexdigest()
+    return (int(digest[:12], 16) % 1000) + 1
+
+def _daily_variation(key, day_suffix):
+
+    digest = hashlib.sha256(f"{key}|{day_suffix}".encode('utf-8')).hexdigest()
+    return (int(digest[:8], 16) % 41) - 20
+
+def card_price(name, set_name, day=None):
+
+    return card_prices([(name, set_name)], day)[0]
+
+def card_prices(cards, day=None):
+
+    day_suffix = (day or price_date()).isoformat()
+    prices = []
+    for card in cards:
+        if isinstance(card, tuple):
+            name, set_name = card
+        else:
+            name, set_name = card.name, card.set_name
+        base_price = _stable_price_seed(name, set_name)
+        variation = _daily_variation(_price_key(name, set_name), day_suffix)
+        prices.append(max(1, min(1000, int(base_price * (1 + variation / 100)))))
+    return prices
+
+def calculate_condition_price(base_price, condition):
+
+    multiplier = CONDITION_MULTIPLIERS.get(condition or 'Near Mint', 1.0)
+    return max(1, int(base_price * multiplier))
+
+def _condition_price_sql(price, condition):
+
+    adjusted = db.case(
+        *[
+            (condition == name, price * numerator // denominator)
+            for name, (numerator, denominator) in CONDITION_PRICE_RATIOS.items()
+        ],
+        else_=price
+    )
+    return db.case((adjusted < 1, 1), else_=adjusted)
+
+def update_daily_prices(chunk_size=1000):
+
+    today = price_date()
+    started = time.perf_counter()
+    stale = (Card.last_price_update != today) | (Card.last_price_update.is_(None))
+
+    card_count = 0
+    item_count = 0
+    last_id = 0
+    while True:
+        rows = (
+            db.session.query(Card.id, Card.name, Card.set_name)
+            .filter(stale, Card.id > last_id)
+            .order_by(Card.id)
+            .limit(chunk_size)
+            .all()
+        )
+        if not rows:
+            break
+        last_id = rows[-1].id
+        card_ids = [row.id for row in rows]
+        prices = card_prices([(row.name, row.set_name) for row in rows], today)
+
+        db.session.bulk_update_mappings(Card, [
+            {'id': row.id, 'price': price, 'last_price_update': today}
+            for row, price in zip(rows, prices)
+        ])
+
+        card_price_column = (
+            db.select(Card.price)
+            .where(Card.id == CollectionItem.card_id)
+            .scalar_subquery()
+        )
+        result = db.session.execute(
+            db.update(CollectionItem)
+            .where(CollectionItem.card_id.in_(card_ids))
+            .values(current_price=_condition_price_sql(card_price_column, CollectionItem.condition))
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+
+        card_count += len(rows)
+        item_count += result.rowcount or 0
+
+    elapsed = max(time.perf_counter() - started, 1e-9)
+    return {
+        'cards': card_count,
+        'collection_items': item_count,
+        'seconds': round(elapsed, 3),
+        'cards_per_second': round(card_count / elapsed, 1),
+        'collection_items_per_second': round(item_count / elapsed, 1)
+    }
+
+def collection_summary(user_id, day=None):
+
+    day = day or price_date()
+    condition_value = _condition_price_sql(Card.price, CollectionItem.condition)
+    totals = (
+        db.session.query(
+            db.func.count(CollectionItem.id),
+            db.func.coalesce(db.func.sum(CollectionItem.purchase_price), 0),
+            db.func.coalesce(db.func.sum(condition_value), 0),
+            db.func.coalesce(db.func.sum(db.case((Card.last_price_update == day, 0), else_=1)), 0)
+        )
+        .join(Card, Card.id == CollectionItem.card_id)
+        .filter(CollectionItem.user_id == user_id)
+        .one()
+    )
+    item_count, cost_basis, total_value, stale_count = (int(value) for value in totals)
+
+    if stale_count:
+        groups = (
+            db.session.query(Card.name, Card.set_name, CollectionItem.condition, db.func.count(CollectionItem.id))
+            .join(Card, Card.id == CollectionItem.card_id)
+            .filter(CollectionItem.user_id == user_id)
+            .group_by(Card.name, Card.set_name, CollectionItem.condition)
+            .all()
+        )
+        prices = card_prices([(name, set_name) for name, set_name, _, _ in groups], day)
+        total_value = sum(
+            calculate_condition_price(price, condition) * count
+            for (_, _, condition, count), price in zip(groups, prices)
+        )
+
+    return {
+        'item_count': item_count,
+        'total_value': total_value,
+        'cost_basis': cost_basis,
+        'profit_loss': total_value - cost_basis
+    }
+
+def materialize_card_price(card, day=None):
+
+    day = day or price_date()
+    card.price = card_price(card.name, card.set_name, day)
+    card.last_price_update = day
+    return card.price
+
+def _seconds_until_next_price_date():
+
+    now = datetime.now(APP_TIMEZONE)
+    next_update = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    return (next_update - now).total_seconds()
+
+def start_price_materializer(app):
+
+    if not os.environ.get('POKETRADER_MATERIALIZE_PRICES'):
+        return None
+
+    def run():
+        while True:
+            try:
+                with app.app_context():
+                    report = update_daily_prices()
+                app.logger.info('Materialized daily prices: %s', report)
+            except Exception:
+                app.logger.exception('Daily price materialization failed')
+            time.sleep(_seconds_until_next_price_date() + 5)
+
+    thread = threading.Thread(target=run, name='price-materializer', daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,180 @@
+# Cross-process token-bucket rate limiter and leader lease with state shared through a SQLite file
+# sqlite3, Python standard library
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+
+    def __init__(self, db_path, name, capacity, refill_rate, max_tokens=1):
+        if float(capacity) < max_tokens:
+            raise ValueError(f'Rate limiter {name!r} capacity {capacity} is below the {max_tokens} tokens a single call takes')
+        self.db_path = str(db_path)
+        self.name = name
+        self.capacity = float(capacity)
+        self.refill_rate = float(refill_rate)
+        self.granted = 0
+        self.denied = 0
+        self.failed_open = 0
+        self._local = threading.local()
+
+    def _fail_open(self, error):
+
+        self.failed_open += 1
+        self.granted += 1
+        logger.warning('Rate limiter %r is failing open: %s', self.name, error)
+        return True
+
+    def _connect(self):
+
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5, isolation_level=None)
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS token_bucket ('
+                'name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)'
+            )
+            self._local.conn = conn
+        return conn
+
+    def _take(self, tokens):
+
+        if tokens > self.capacity:
+            raise ValueError(f'Rate limiter {self.name!r} capacity {self.capacity:g} can never grant {tokens} tokens')
+        conn = self._connect()
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                'SELECT tokens, updated_at FROM token_bucket WHERE name = ?', (self.name,)
+            ).fetchone()
+            if row is None:
+                available = self.capacity
+            else:
+                elapsed = max(0.0, now - row[1])
+                available = min(self.capacity, row[0] + elapsed * self.refill_rate)
+
+            if available >= tokens:
+                available -= tokens
+                wait = 0.0
+            else:
+                wait = (tokens - available) / self.refill_rate if self.refill_rate > 0 else None
+
+            conn.execute(
+                'INSERT OR REPLACE INTO token_bucket (name, tokens, updated_at) VALUES (?, ?, ?)',
+                (self.name, available, now)
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return wait
+
+    def try_acquire(self, tokens=1):
+
+        try:
+            wait = self._take(tokens)
+        except sqlite3.Error as e:
+            return self._fail_open(e)
+
+        if wait == 0.0:
+            self.granted += 1
+            return True
+        self.denied += 1
+        return False
+
+    def acquire(self, tokens=1, timeout=None):
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            try:
+                wait = self._take(tokens)
+            except sqlite3.Error as e:
+                return self._fail_open(e)
+
+            if wait == 0.0:
+                self.granted += 1
+                return True
+            if wait is None:
+                self.denied += 1
+                return False
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.denied += 1
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+    def stats(self):
+
+        return {
+            'capacity': self.capacity,
+            'refill_rate': self.refill_rate,
+            'granted': self.granted,
+            'denied': self.denied,
+            'failed_open': self.failed_open,
+        }
+
+
+class LeaderLease:
+
+    def __init__(self, db_path, name, ttl_seconds, holder=None):
+        self.db_path = str(db_path)
+        self.name = name
+        self.ttl_seconds = float(ttl_seconds)
+        self.holder = holder or f'{os.getpid()}-{uuid.uuid4().hex[:8]}'
+        self._local = threading.local()
+
+    def _connect(self):
+
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5, isolation_level=None)
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS leader_lease ('
+                'name TEXT PRIMARY KEY, holder TEXT NOT NULL, expires_at REAL NOT NULL)'
+            )
+            self._local.conn = conn
+        return conn
+
+    def try_acquire(self):
+
+        try:
+            conn = self._connect()
+            now = time.time()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                row = conn.execute(
+                    'SELECT holder, expires_at FROM leader_lease WHERE name = ?', (self.name,)
+                ).fetchone()
+                held = row is None or row[0] == self.holder or row[1] <= now
+                if held:
+                    conn.execute(
+                        'INSERT OR REPLACE INTO leader_lease (name, holder, expires_at) VALUES (?, ?, ?)',
+                        (self.name, self.holder, now + self.ttl_seconds)
+                    )
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+        except sqlite3.Error as e:
+            logger.warning('Leader lease %r is failing open: %s', self.name, e)
+            return True
+        return held
+
+    def release(self):
+
+        try:
+            self._connect().execute(
+                'DELETE FROM leader_lease WHERE name = ? AND holder = ?', (self.name, self.holder)
+            )
+        except sqlite3.Error:
+            pass
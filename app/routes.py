@@ -2,40 +2,52 @@
 # Flask, Flask-Login, SQLAlchemy, requests, zoneinfo
 
 from functools import wraps
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, abort
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, abort, current_app, send_file
 from flask_login import login_required, current_user, logout_user
-from app.models import User, Card, CollectionItem, Trade, OfferedCard, RequestedCard, TradeStatus
-from app import db
+from app.models import User, Card, CollectionItem, Trade, OfferedCard, RequestedCard, TradeStatus, TradeReservation, ImportJob
+from app.identity import UserIdentity, admin_for, identity_cache
+from app import db, tcg_api
+from sqlalchemy.orm import joinedload
 from app.precached_pokemon import get_precached_cards
-import requests
+from app.search_cache import TieredCardCache, slim_card
+from app.name_index import NamePrefixIndex
+from app.cache_warmer import QueryTracker, CacheWarmer
+from app.rate_limit import LeaderLease
+from app.image_proxy import CardImageStore, ImageUnavailable, IMAGE_SIZES
+from app.catalog import catalog_mirror_complete
+from app.import_jobs import submit_import_job, resume_import_job, job_status
+from app.pricing import (
+    APP_TIMEZONE, card_price, card_prices, calculate_condition_price,
+    collection_summary, materialize_card_price, update_daily_prices, price_date
+)
+from app.trades import (
+    load_sent_trades, load_received_trades, load_trade_with_items, reserved_item_ids, is_item_reserved,
+    reserve_items, release_trade_items, credit_balance, ItemsAlreadyReserved
+)
+from app.tcg_api import (
+    get_api_session, api_headers, fetch_name_search, SingleFlight, RateLimitExceeded, api_rate_limiter,
+    NAME_SEARCH_TOKENS
+)
 import os
-import time
-import json
 import hashlib
-import random
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
-from zoneinfo import ZoneInfo
 
 bp = Blueprint('main', __name__)
 
 
 
-ADMIN_USERS = set(
-    user.strip().lower()
-    for user in os.environ.get('ADMIN_USERS', '').split(',')
-    if user.strip()
-)
-
 def is_admin():
 
     if not current_user.is_authenticated:
         return False
 
-    return (
-        current_user.email.lower() in ADMIN_USERS or
-        current_user.username.lower() in ADMIN_USERS
-    )
+    if isinstance(current_user._get_current_object(), UserIdentity):
+        return current_user.is_admin
+    return admin_for(current_user.username, current_user.email)
 
 def admin_required(f):
 
@@ -55,14 +67,42 @@ else:
     default_cache_root = Path('cache')
 
 CACHE_DIR = Path(os.environ.get('POKETRADER_CACHE_DIR', default_cache_root))
-CACHE_DIR.mkdir(parents=True, exist_ok=True)
 CACHE_DURATION = timedelta(hours=24)
+CACHE_SOFT_DURATION = timedelta(seconds=int(os.environ.get('POKETRADER_CACHE_SOFT_TTL', 6 * 3600)))
+
+search_cache = TieredCardCache(
+    CACHE_DIR,
+    CACHE_DURATION,
+    soft_max_age=CACHE_SOFT_DURATION,
+    max_entries=int(os.environ.get('POKETRADER_MEMORY_CACHE_SIZE', 256)),
+    memory_ttl_seconds=int(os.environ.get('POKETRADER_MEMORY_CACHE_TTL', 300)),
+    negative_ttl_seconds=int(os.environ.get('POKETRADER_NEGATIVE_CACHE_TTL', 30)),
+    max_bytes=int(os.environ.get('POKETRADER_FILE_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+)
 
 
-INSTANT_POKEMON = ['Pikachu', 'Charizard', 'Mewtwo', 'Meowscarada']
+card_images = CardImageStore(
+    CACHE_DIR / 'images',
+    os.environ.get('POKETRADER_IMAGE_HOSTS', 'images.pokemontcg.io').split(','),
+    timeout=int(os.environ.get('POKETRADER_IMAGE_TIMEOUT', 10)),
+    max_bytes=int(os.environ.get('POKETRADER_IMAGE_CACHE_MAX_BYTES', 128 * 1024 * 1024))
+)
+IMAGE_MAX_AGE = 365 * 24 * 3600
+IMAGE_FALLBACK_MAX_AGE = 3600
+
+
+DASHBOARD_PAGE_SIZE = 60
+
+
+SEARCH_MAX_AGE = int(os.environ.get('POKETRADER_SEARCH_MAX_AGE', 300))
+AUTOCOMPLETE_MAX_AGE = int(os.environ.get('POKETRADER_AUTOCOMPLETE_MAX_AGE', 300))
+
 
+LOCAL_CATALOG_SEARCH = bool(os.environ.get('POKETRADER_LOCAL_CATALOG_SEARCH'))
+TYPO_THRESHOLD = float(os.environ.get('POKETRADER_TYPO_THRESHOLD', 0.5))
 
-APP_TIMEZONE = ZoneInfo('UTC')
+
+INSTANT_POKEMON = ['Pikachu', 'Charizard', 'Mewtwo', 'Meowscarada']
 
 
 COMMON_POKEMON = INSTANT_POKEMON + [
@@ -75,140 +115,35 @@ COMMON_POKEMON = INSTANT_POKEMON + [
 ]
 
 
-_api_session = None
-
-
-_last_api_call_time = None
-_min_api_delay = 1.0
-
-def get_api_session():
-
-    global _api_session
-    if _api_session is None:
-        _api_session = requests.Session()
-
-        adapter = requests.adapters.HTTPAdapter(
-            pool_connections=10,
-            pool_maxsize=20,
-            max_retries=0
-        )
-        _api_session.mount('https://', adapter)
-
-        _api_session.headers.update({'Accept-Encoding': 'gzip, deflate'})
-    return _api_session
-
-def _rate_limit_api_call():
-
-    global _last_api_call_time
-    if _last_api_call_time is not None:
-        time_since_last = time.time() - _last_api_call_time
-        if time_since_last < _min_api_delay:
-            sleep_time = _min_api_delay - time_since_last
-            time.sleep(sleep_time)
-    _last_api_call_time = time.time()
-
 def get_cache_path(query):
 
-    cache_key = hashlib.md5(query.lower().encode()).hexdigest()
-    return CACHE_DIR / f"{cache_key}.json"
+    return search_cache.files.path_for(query.lower())
 
 def load_from_cache(query):
 
-    cache_file = get_cache_path(query)
-    if not cache_file.exists():
-        return None
-
-    try:
-        with open(cache_file, 'r') as f:
-            data = json.load(f)
-            cache_time = datetime.fromisoformat(data['timestamp'])
-            if datetime.now() - cache_time < CACHE_DURATION:
-                return data['cards']
-    except (json.JSONDecodeError, KeyError, ValueError):
-
-        cache_file.unlink()
-    return None
+    return search_cache.get(query)
 
 def save_to_cache(query, cards):
 
-    cache_file = get_cache_path(query)
-    try:
-        with open(cache_file, 'w') as f:
-            json.dump({
-                'timestamp': datetime.now().isoformat(),
-                'cards': cards
-            }, f)
-    except Exception:
-
-        pass
-
-def _stable_price_seed(name, set_name=None):
-
-    base = (name or 'unknown').lower()
-    if set_name:
-        base += f"|{set_name.lower()}"
-    digest = hashlib.sha256(base.encode('utf-8')).hexdigest()
-    return (int(digest[:12], 16) % 1000) + 1
-
-def initialize_card_price(card):
-
-    today = datetime.now(APP_TIMEZONE).date()
-    price_changed = False
-    new_price = card.price
-
-
-    if card.price is None or card.last_price_update != today:
+    search_cache.put(query, cards)
 
-        base_price = _stable_price_seed(card.name, card.set_name)
+def _payload_etag(kind, payload):
 
-        if card.price is None:
+    digest = hashlib.sha256(json.dumps(payload, separators=(',', ':'), default=str).encode()).hexdigest()
+    return f'{kind}-{digest[:32]}'
 
-            new_price = base_price
-        else:
-
-            variation = random.randint(-20, 20)
-            new_price = int(base_price * (1 + variation / 100))
-
-
-        new_price = max(1, min(1000, new_price))
-
-        card.price = new_price
-        card.last_price_update = today
-        price_changed = True
-
-    if price_changed:
-
-        for owner_item in card.owners:
-            owner_item.current_price = calculate_condition_price(new_price, owner_item.condition)
-        db.session.commit()
+def _conditional_json(etag, max_age, build_payload):
 
-    return card.price
-
-def update_daily_prices():
-
-    today = datetime.now(APP_TIMEZONE).date()
-    cards = Card.query.filter(
-        (Card.last_price_update != today) | (Card.last_price_update.is_(None))
-    ).all()
-
-    updated_count = 0
-    for card in cards:
-
-        fluctuation = random.uniform(-0.15, 0.15)
-        new_price = int(card.price * (1 + fluctuation))
-
-
-        new_price = max(1, min(1000, new_price))
-
-        card.price = new_price
-        card.last_price_update = today
-        updated_count += 1
-
-    if updated_count > 0:
-        db.session.commit()
-
-
-    return updated_count
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = jsonify(build_payload())
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.max_age = max(0, int(max_age))
+    response.cache_control.must_revalidate = True
+    response.vary.add('Cookie')
+    return response
 
 def get_time_until_next_price_update():
 
@@ -230,60 +165,79 @@ def get_time_until_next_price_update():
         'seconds': seconds
     }
 
-@bp.route('/')
-def index():
+@bp.app_template_filter('card_image')
+def card_image_url(url, size='sm'):
 
-    return render_template('index.html', title='Home')
+    token = card_images.token_for(url)
+    if token is None:
+        return url
+    return url_for('main.card_image', size=size, token=token)
 
-def calculate_condition_price(base_price, condition):
+@bp.route('/img/<size>/<token>')
+def card_image(size, token):
 
-    condition_multipliers = {
-        'Near Mint': 1.0,
-        'Lightly Played': 0.8,
-        'Moderately Played': 0.64,
-        'Heavily Played': 0.512,
-        'Damaged': 0.4096
-    }
-    multiplier = condition_multipliers.get(condition or 'Near Mint', 1.0)
-    return max(1, int(base_price * multiplier))
+    if size not in IMAGE_SIZES and size != 'original':
+        abort(404)
+    url = card_images.url_for_token(token)
+    if url is None:
+        abort(404)
 
-@bp.route('/dashboard')
-@login_required
-def dashboard():
+    try:
+        path, mimetype, etag, immutable = card_images.variant(url, size)
+        response = send_file(
+            path, mimetype=mimetype, etag=etag, conditional=True,
+            max_age=IMAGE_MAX_AGE if immutable else IMAGE_FALLBACK_MAX_AGE
+        )
+    except (ImageUnavailable, FileNotFoundError):
+        return redirect(url)
 
+    response.cache_control.public = True
+    response.cache_control.immutable = immutable
+    return response
 
-    db.session.refresh(current_user)
+@bp.route('/')
+def index():
 
-    collection = CollectionItem.query.filter_by(user_id=current_user.id).all()
+    return render_template('index.html', title='Home')
 
+@bp.route('/dashboard')
+@login_required
+def dashboard():
 
-    for item in collection:
-        initialize_card_price(item.card_info)
+    page = max(request.args.get('page', 1, type=int), 1)
+    summary = collection_summary(current_user.id)
+    total_pages = max(1, -(-summary['item_count'] // DASHBOARD_PAGE_SIZE))
+    page = min(page, total_pages)
+
+    collection = (
+        CollectionItem.query
+        .options(joinedload(CollectionItem.card_info))
+        .filter(CollectionItem.user_id == current_user.id)
+        .order_by(CollectionItem.id)
+        .limit(DASHBOARD_PAGE_SIZE)
+        .offset((page - 1) * DASHBOARD_PAGE_SIZE)
+        .all()
+    )
+    base_prices = card_prices(item.card_info for item in collection)
 
 
     collection_with_prices = []
-    prices_updated = False
-    for item in collection:
-        base_price = item.card_info.price
-        stored_current_price = item.current_price or 0
-        if stored_current_price <= 0:
-            stored_current_price = calculate_condition_price(base_price, item.condition)
-            item.current_price = stored_current_price
-            prices_updated = True
+    for item, base_price in zip(collection, base_prices):
+        display_price = calculate_condition_price(base_price, item.condition)
         collection_with_prices.append({
             'item': item,
-            'display_price': stored_current_price,
+            'display_price': display_price,
             'base_price': base_price,
-            'purchase_price': item.purchase_price or stored_current_price
+            'purchase_price': item.purchase_price or display_price
         })
 
-    if prices_updated:
-        db.session.commit()
-
     time_until_update = get_time_until_next_price_update()
     return render_template('dashboard.html',
                          title='Dashboard',
                          collection=collection_with_prices,
+                         summary=summary,
+                         page=page,
+                         total_pages=total_pages,
                          balance=current_user.balance,
                          time_until_update=time_until_update)
 
@@ -386,110 +340,152 @@ def _deduplicate_cards(cards):
     return list(seen.values())
 
 
-def _perform_card_search(query):
+_upstream_searches = SingleFlight()
 
-    cards = []
-    error = None
-    from_cache = False
-    api_failed = False
+_refresh_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get('POKETRADER_CACHE_REFRESH_WORKERS', 2)),
+    thread_name_prefix='cache-refresh'
+)
+_refreshing = set()
+_refreshing_lock = threading.Lock()
 
-    if not query or len(query) < 2:
-        return cards, error, from_cache, api_failed
+def _fetch_upstream_cards(search_query):
 
+    search_for_api = ' '.join(word.capitalize() for word in search_query.split())
+    is_simple_name = " " not in search_query and search_query.isalpha()
 
-    normalized_query = query.strip().lower()
-    search_query = query.strip()
+    if not api_rate_limiter.try_acquire(NAME_SEARCH_TOKENS if is_simple_name else 1):
+        raise RateLimitExceeded(search_query)
 
+    cards = fetch_name_search(search_for_api, is_simple_name, timeout=30)
+    cards = _filter_cards_by_name(cards, search_for_api)
+    cards = _deduplicate_cards(cards)
+    cards = cards[:15]
 
-    precached = get_precached_cards(normalized_query)
-    if precached is not None and len(precached) > 0:
-        cards = precached
-        from_cache = True
-        return cards, error, from_cache, api_failed
+    save_to_cache(search_query.lower(), cards)
+    return cards
 
+def _card_dict(card):
 
-    cached_cards = load_from_cache(normalized_query)
-    if cached_cards is not None:
-        cards = cached_cards
-        from_cache = True
+    return {
+        'id': card.api_card_id,
+        'name': card.name,
+        'images': {
+            'small': card.image_url_small,
+            'large': card.image_url_large or card.image_url_small,
+        },
+        'set': {'name': card.set_name or 'Unknown Set'},
+    }
 
-        return cards, error, from_cache, api_failed
+def _search_local_catalog(search_for_api):
 
+    db_cards = (
+        Card.query
+        .filter(Card.name_starts_with(search_for_api))
+        .order_by(Card.name)
+        .limit(20)
+        .all()
+    )
+    return _deduplicate_cards([_card_dict(c) for c in db_cards])[:15]
 
+def _refresh_search_in_background(search_query):
 
-    _rate_limit_api_call()
+    key = search_query.lower()
+    with _refreshing_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
 
-    api_key = os.environ.get('POKEMON_TCG_API_KEY')
-    headers = {'X-Api-Key': api_key} if api_key else {}
-    session = get_api_session()
+    def refresh():
 
+        try:
+            _upstream_searches.do(key, lambda: _fetch_upstream_cards(search_query))
+        except Exception:
+            pass
+        finally:
+            with _refreshing_lock:
+                _refreshing.discard(key)
 
+    _refresh_executor.submit(refresh)
 
+def _served_without_upstream(query):
 
-    search_for_api = ' '.join(word.capitalize() for word in search_query.split())
-    is_simple_name = " " not in search_query and search_query.isalpha()
+    if get_precached_cards(query):
+        return True
+    return LOCAL_CATALOG_SEARCH and catalog_mirror_complete()
 
+def _warm_search(query):
 
-    timeout_seconds = 30
+    _upstream_searches.do(query, lambda: _fetch_upstream_cards(query))
 
-    try:
+def _search_suggestions(query):
 
-        if is_simple_name:
-
-            exact_query = f'name:"{search_for_api}"'
-            response = session.get(
-                'https://api.pokemontcg.io/v2/cards',
-                params={
-                    'q': exact_query,
-                    'pageSize': 20,
-                    'select': 'id,name,set,images',
-                    'orderBy': '-set.releaseDate'
-                },
-                headers=headers,
-                timeout=timeout_seconds
-            )
-            response.raise_for_status()
-            data = response.json()
-            cards = data.get('data', []) or []
+    normalized_query = query.strip().lower()
+    card_name_index.ensure_loaded()
+    if card_name_index.search(normalized_query, limit=1):
+        return []
+    return card_name_index.fuzzy_search(normalized_query)
 
+def _typo_suggestions(normalized_query):
 
-        if len(cards) < 5:
+    if not catalog_mirror_complete():
+        return []
+    card_name_index.ensure_loaded()
+    if card_name_index.search(normalized_query, limit=1):
+        return []
+    return card_name_index.fuzzy_search(normalized_query, threshold=TYPO_THRESHOLD)
 
+def _perform_card_search(query):
 
-            prefix_query = f'name:{search_for_api}*'
-            response = session.get(
-                'https://api.pokemontcg.io/v2/cards',
-                params={
-                    'q': prefix_query,
-                    'pageSize': 20,
-                    'select': 'id,name,set,images',
-                    'orderBy': '-set.releaseDate'
-                },
-                headers=headers,
-                timeout=timeout_seconds
-            )
-            response.raise_for_status()
-            data = response.json()
-            additional_cards = data.get('data', []) or []
+    import requests
 
+    cards = []
+    error = None
+    from_cache = False
+    api_failed = False
 
-            existing_ids = {c.get('id') for c in cards}
-            for card in additional_cards:
-                if card.get('id') not in existing_ids:
-                    cards.append(card)
-                    existing_ids.add(card.get('id'))
+    if not query or len(query) < 2:
+        return cards, error, from_cache, api_failed
 
 
-        cards = _filter_cards_by_name(cards, search_for_api)
+    normalized_query = query.strip().lower()
+    search_query = query.strip()
 
 
-        cards = _deduplicate_cards(cards)
+    precached = get_precached_cards(normalized_query)
+    if precached is not None and len(precached) > 0:
+        cards = precached
+        from_cache = True
+        return cards, error, from_cache, api_failed
+
+
+    cached_cards, stale = search_cache.lookup(normalized_query)
+    if cached_cards is not None:
+        cards = cached_cards
+        from_cache = True
+        if stale:
+            _refresh_search_in_background(search_query)
 
+        return cards, error, from_cache, api_failed
+
+
+    if _typo_suggestions(normalized_query):
+        search_cache.remember_miss(normalized_query)
+        from_cache = True
+        return cards, error, from_cache, api_failed
+
+    search_for_api = ' '.join(word.capitalize() for word in search_query.split())
 
-        cards = cards[:15]
+    if LOCAL_CATALOG_SEARCH and catalog_mirror_complete():
+        cards = _search_local_catalog(search_for_api)
+        from_cache = True
+        return cards, error, from_cache, api_failed
 
+    try:
+        cards = _upstream_searches.do(normalized_query, lambda: _fetch_upstream_cards(search_query))
 
-        save_to_cache(normalized_query, cards)
+    except RateLimitExceeded:
+        api_failed = True
 
     except requests.exceptions.HTTPError as e:
         if e.response.status_code == 429:
@@ -517,28 +513,8 @@ def _perform_card_search(query):
             error = None
         else:
 
-            db_cards = (
-                Card.query
-                .filter(Card.name.ilike(f'{search_for_api}%'))
-                .order_by(Card.name)
-                .limit(20)
-                .all()
-            )
-            if db_cards:
-                cards = [
-                    {
-                        'id': c.api_card_id,
-                        'name': c.name,
-                        'images': {
-                            'small': c.image_url_small,
-                            'large': c.image_url_large or c.image_url_small,
-                        },
-                        'set': {'name': c.set_name or 'Unknown Set'},
-                    }
-                    for c in db_cards
-                ]
-
-                cards = _deduplicate_cards(cards)[:15]
+            cards = _search_local_catalog(search_for_api)
+            if cards:
                 from_cache = True
                 error = None
             else:
@@ -547,6 +523,66 @@ def _perform_card_search(query):
 
     return cards, error, from_cache, api_failed
 
+def _load_card_names():
+
+    db_names = [row[0] for row in db.session.query(Card.name).distinct().all()]
+    return db_names + COMMON_POKEMON
+
+card_name_index = NamePrefixIndex(
+    _load_card_names,
+    max_age_seconds=int(os.environ.get('POKETRADER_NAME_INDEX_TTL', 600))
+)
+
+search_queries = QueryTracker()
+
+WARM_INTERVAL = int(os.environ.get('POKETRADER_WARM_INTERVAL', 3600))
+
+cache_warmer = CacheWarmer(
+    search_cache,
+    _warm_search,
+    COMMON_POKEMON,
+    search_queries,
+    api_rate_limiter,
+    skip=_served_without_upstream,
+    lease=LeaderLease(
+        api_rate_limiter.db_path,
+        'cache-warmer',
+        ttl_seconds=2 * WARM_INTERVAL
+    ),
+    top_n=int(os.environ.get('POKETRADER_WARM_TOP_QUERIES', 20)),
+    interval_seconds=WARM_INTERVAL,
+    tokens_per_query=NAME_SEARCH_TOKENS
+)
+
+def _price_search_results(cards, require_id=True):
+
+    card_dicts = []
+    for api_card in cards:
+
+        if isinstance(api_card, dict):
+            card_data = api_card.copy()
+        else:
+
+            card_data = {
+                'id': getattr(api_card, 'id', None),
+                'name': getattr(api_card, 'name', ''),
+                'images': getattr(api_card, 'images', {}),
+                'set': getattr(api_card, 'set', {})
+            }
+
+        if require_id and not card_data.get('id'):
+            continue
+        card_dicts.append(card_data)
+
+    prices = card_prices(
+        (card_data.get('name', ''), (card_data.get('set') or {}).get('name', ''))
+        for card_data in card_dicts
+    )
+    for card_data, price in zip(card_dicts, prices):
+        card_data['price'] = price
+
+    return card_dicts
+
 @bp.route('/search/cards')
 @login_required
 def search_cards():
@@ -554,11 +590,9 @@ def search_cards():
     query = request.args.get('q', '').strip()
     cache_only = request.args.get('cache_only', 'false').lower() == 'true'
     cards = []
+    suggestions = []
     error = None
     from_cache = False
-
-
-    db.session.refresh(current_user)
     time_until_update = get_time_until_next_price_update()
 
 
@@ -575,11 +609,9 @@ def search_cards():
 
     if query:
 
-        normalized_query = query.strip().lower()
-        cached_cards = load_from_cache(normalized_query)
-
         if cache_only:
 
+            cached_cards = load_from_cache(query.strip().lower())
             if cached_cards is not None:
                 cards = cached_cards
                 from_cache = True
@@ -589,51 +621,19 @@ def search_cards():
         else:
 
             cards, error, from_cache, api_failed = _perform_card_search(query)
+            search_queries.record(query, from_cache)
 
 
-            if (not cards or len(cards) == 0) and cached_cards is not None and len(cached_cards) > 0:
-                cards = cached_cards
-                from_cache = True
-                error = None
+            if api_failed and cards:
                 flash('Showing cached results.', 'info')
-            elif api_failed and (not cards or len(cards) == 0):
+            elif api_failed:
 
                 flash('The Pokemon TCG API is currently unresponsive. Please try again later or use cache-only mode.', 'warning')
 
 
-        cards_with_prices = []
-        if cards:
-            for api_card in cards:
-
-                if isinstance(api_card, dict):
-                    card_data = api_card.copy()
-                else:
-
-                    card_data = {
-                        'id': getattr(api_card, 'id', None),
-                        'name': getattr(api_card, 'name', ''),
-                        'images': getattr(api_card, 'images', {}),
-                        'set': getattr(api_card, 'set', {})
-                    }
-
-                api_card_id = card_data.get('id')
-                if not api_card_id:
-                    continue
-
-
-                db_card = Card.query.filter_by(api_card_id=api_card_id).first()
-                if db_card:
-                    card_price = initialize_card_price(db_card)
-                    card_data['price'] = card_price
-                else:
-
-                    card_name = card_data.get('name', '')
-                    set_name = card_data.get('set', {}).get('name', '')
-                    estimated_price = _stable_price_seed(card_name, set_name)
-                    card_data['price'] = estimated_price
-
-                cards_with_prices.append(card_data)
-        cards = cards_with_prices
+        cards = _price_search_results(cards) if cards else []
+        if not cards:
+            suggestions = _search_suggestions(query)
 
 
     if cards:
@@ -647,6 +647,7 @@ def search_cards():
                          cards=cards,
                          query=query,
                          error=error,
+                         suggestions=suggestions,
                          balance=current_user.balance,
                          time_until_update=time_until_update)
 
@@ -657,27 +658,15 @@ def autocomplete():
     query = request.args.get('q', '').strip().lower()
 
     if len(query) < 2:
-        return jsonify({'suggestions': []})
-
-    suggestions = []
-
-
-    db_cards = Card.query.filter(Card.name.ilike(f'{query}%')).limit(10).all()
-    for card in db_cards:
-        if card.name not in suggestions:
-            suggestions.append(card.name)
-
-
-    for pokemon in COMMON_POKEMON:
-        if pokemon.lower().startswith(query) and pokemon not in suggestions:
-            suggestions.append(pokemon)
-            if len(suggestions) >= 15:
-                break
+        return _conditional_json(_payload_etag('autocomplete', []), AUTOCOMPLETE_MAX_AGE, lambda: {'suggestions': []})
 
+    card_name_index.ensure_loaded()
+    suggestions = card_name_index.search(query, limit=15)
+    if not suggestions:
+        suggestions = card_name_index.fuzzy_search(query, limit=5, threshold=0.3)
 
-    suggestions.sort(key=lambda x: (not x.lower().startswith(query), x.lower()))
-
-    return jsonify({'suggestions': suggestions[:15]})
+    etag = _payload_etag('autocomplete', suggestions)
+    return _conditional_json(etag, AUTOCOMPLETE_MAX_AGE, lambda: {'suggestions': suggestions})
 
 @bp.route('/api/search/cards')
 @login_required
@@ -694,42 +683,54 @@ def api_search_cards():
         })
 
     cards, error, from_cache, api_failed = _perform_card_search(query)
+    search_queries.record(query, from_cache)
 
+    suggestions = [] if cards else _search_suggestions(query)
 
-    cards_with_prices = []
-    for api_card in cards:
-
-        card_data = api_card.copy() if isinstance(api_card, dict) else dict(api_card)
-        api_card_id = card_data.get('id')
-
-
-        db_card = Card.query.filter_by(api_card_id=api_card_id).first()
-        if db_card:
-            card_price = initialize_card_price(db_card)
-            card_data['price'] = card_price
-        else:
-
-            card_data['price'] = _stable_price_seed(
-                card_data.get('name', ''),
-                card_data.get('set', {}).get('name', '')
-            )
-
-        cards_with_prices.append(card_data)
-
-
-    error_message = None
-    if api_failed and len(cards_with_prices) == 0:
-        error_message = "API_TIMEOUT"
+    if api_failed and not cards:
+        response = jsonify({
+            'success': False,
+            'error': 'API_TIMEOUT',
+            'cards': [],
+            'suggestions': suggestions,
+            'from_cache': from_cache,
+            'api_failed': api_failed,
+            'count': 0
+        })
+        response.cache_control.no_store = True
+        return response
+
+    day = price_date()
+    generation, cache_time = search_cache.version(query.strip())
+    etag = _payload_etag('search', [
+        query.strip().lower(), generation, cache_time, day.isoformat(), error, api_failed, suggestions,
+        [slim_card(card) for card in cards if isinstance(card, dict)]
+    ])
+
+    def build_payload():
+
+        cards_with_prices = _price_search_results(cards, require_id=False)
+        return {
+            'success': error is None and len(cards_with_prices) > 0,
+            'error': error,
+            'cards': cards_with_prices,
+            'from_cache': from_cache,
+            'api_failed': api_failed,
+            'count': len(cards_with_prices),
+            'suggestions': suggestions,
+            'price_date': day.isoformat()
+        }
+
+    max_age = 0 if api_failed else min(SEARCH_MAX_AGE, get_time_until_next_price_update()['total_seconds'])
+    return _conditional_json(etag, max_age, build_payload)
+
+@bp.route('/api/balance')
+@login_required
+def api_balance():
 
-    return jsonify({
-        'success': error is None and len(cards_with_prices) > 0,
-        'error': error_message or error,
-        'cards': cards_with_prices,
-        'from_cache': from_cache,
-        'api_failed': api_failed,
-        'count': len(cards_with_prices),
-        'user_balance': current_user.balance
-    })
+    response = jsonify({'balance': current_user.balance})
+    response.cache_control.no_store = True
+    return response
 
 @bp.route('/admin/clear-cache')
 @login_required
@@ -737,32 +738,59 @@ def clear_cache():
 
     try:
 
-        if CACHE_DIR.exists():
-            for cache_file in CACHE_DIR.glob('*.json'):
-                cache_file.unlink()
+        search_cache.clear()
         flash('Cache cleared successfully! New searches will fetch fresh data from the API.', 'success')
     except Exception as e:
         flash(f'Error clearing cache: {str(e)}', 'danger')
     return redirect(url_for('main.search_cards'))
 
+@bp.route('/admin/cache-stats')
+@login_required
+@admin_required
+def cache_stats():
+
+    return jsonify({
+        **search_cache.stats(),
+        'rate_limit': api_rate_limiter.stats(),
+        'warmer': cache_warmer.stats(),
+        'images': card_images.stats(),
+        'identities': identity_cache.stats()
+    })
+
+@bp.route('/admin/warm-cache', methods=['POST'])
+@login_required
+@admin_required
+def warm_cache():
+
+    started = cache_warmer.trigger(current_app._get_current_object())
+    return jsonify({
+        'status': 'started' if started else 'already running',
+        'candidates': len(cache_warmer.candidates()),
+        'last_report': cache_warmer.last_report
+    }), 202
+
 @bp.route('/admin/test-api')
 @login_required
 @admin_required
 def test_api():
 
+    import requests
 
-    _rate_limit_api_call()
+    if not api_rate_limiter.acquire(timeout=5):
+        return jsonify({
+            'status': 'error',
+            'message': 'Local API rate budget exhausted, try again shortly',
+            'rate_limit': api_rate_limiter.stats()
+        }), 429
 
-    api_key = os.environ.get('POKEMON_TCG_API_KEY')
-    headers = {'X-Api-Key': api_key} if api_key else {}
     session = get_api_session()
 
     try:
 
         response = session.get(
-            'https://api.pokemontcg.io/v2/cards',
+            f'{tcg_api.TCG_API_URL}/cards',
             params={'q': 'name:Pikachu*', 'pageSize': 1},
-            headers=headers,
+            headers=api_headers(),
             timeout=10
         )
         if response.status_code == 200:
@@ -795,10 +823,18 @@ def test_api():
 @admin_required
 def update_prices():
 
-    updated = update_daily_prices()
-    flash(f'Updated prices for {updated} cards!', 'success')
+    report = update_daily_prices()
+    flash(
+        f"Updated prices for {report['cards']} cards and {report['collection_items']} collection items "
+        f"in {report['seconds']}s ({report['cards_per_second']} cards/sec)!",
+        'success'
+    )
     return redirect(url_for('main.dashboard'))
 
+def _add_imported_names(cards):
+
+    card_name_index.add(card.get('name') for card in cards)
+
 @bp.route('/admin/bulk-import-cards', methods=['GET', 'POST'])
 @login_required
 @admin_required
@@ -810,142 +846,55 @@ def bulk_import_cards_endpoint():
 
         total_cards = Card.query.count()
         pokemon_with_cards = db.session.query(Card.name).distinct().count()
+        recent_jobs = ImportJob.query.order_by(ImportJob.id.desc()).limit(5).all()
         return jsonify({
             'status': 'ready',
             'total_cards': total_cards,
             'unique_pokemon': pokemon_with_cards,
+            'recent_jobs': [
+                {'job_id': job.id, 'status': job.status, 'processed': job.processed, 'total': len(job.pokemon_list or [])}
+                for job in recent_jobs
+            ],
             'message': f'Currently have {total_cards} cards from {pokemon_with_cards} Pokemon. POST to import more.'
         })
 
 
     data = request.get_json() or {}
-    pokemon_list = data.get('pokemon_list', COMMON_POKEMON[:10])
-    max_cards_per_pokemon = data.get('max_cards', 10)
-
-    api_key = os.environ.get('POKEMON_TCG_API_KEY')
-    headers = {'X-Api-Key': api_key} if api_key else {}
-    headers['Accept-Encoding'] = 'gzip, deflate'
-    session = get_api_session()
-    session.headers.update(headers)
+    app = current_app._get_current_object()
+
+    if data.get('resume_job'):
+        job = db.session.get(ImportJob, data['resume_job'])
+        if job is None:
+            abort(404)
+        if not resume_import_job(app, job, on_batch=_add_imported_names):
+            return jsonify({'status': job.status, 'job_id': job.id, 'message': f'Import job {job.id} is not resumable.'}), 409
+    else:
+        pokemon_list = data.get('pokemon_list', COMMON_POKEMON[:10])
+        max_cards_per_pokemon = data.get('max_cards', 10)
+        job = submit_import_job(
+            app,
+            pokemon_list,
+            max_cards=max_cards_per_pokemon,
+            requested_by_id=current_user.id,
+            on_batch=_add_imported_names
+        )
 
-    results = {
-        'imported': 0,
-        'skipped': 0,
-        'failed': 0,
-        'pokemon_processed': []
-    }
+    return jsonify({
+        'status': 'queued',
+        'job_id': job.id,
+        'status_url': url_for('main.import_job_status', job_id=job.id),
+        'message': f'Import job {job.id} queued for {len(job.pokemon_list)} Pokemon. Poll status_url for progress.'
+    }), 202
 
-    for pokemon_name in pokemon_list:
-        pokemon_result = {'name': pokemon_name, 'status': 'failed', 'imported': 0, 'skipped': 0}
-
-        for attempt in range(3):
-            try:
-
-                response = session.get(
-                    'https://api.pokemontcg.io/v2/cards',
-                    params={
-                        'q': f'name:"{pokemon_name}"',
-                        'pageSize': max_cards_per_pokemon,
-                        'select': 'id,name,set,images'
-                    },
-                    timeout=60
-                )
-
-                if response.status_code == 404:
-
-                    response = session.get(
-                        'https://api.pokemontcg.io/v2/cards',
-                        params={
-                            'q': f'name:{pokemon_name}*',
-                            'pageSize': max_cards_per_pokemon,
-                            'select': 'id,name,set,images'
-                        },
-                        timeout=60
-                    )
-
-                if response.status_code == 504:
-
-                    if attempt < 2:
-                        time.sleep(15 * (attempt + 1))
-                        continue
-                    else:
-                        pokemon_result['status'] = 'gateway_timeout'
-                        break
-
-                response.raise_for_status()
-                card_data_list = response.json().get('data', [])
-
-                imported = 0
-                skipped = 0
-
-                for card_data in card_data_list:
-                    api_card_id = card_data.get('id')
-                    if not api_card_id:
-                        continue
-
-                    existing = Card.query.filter_by(api_card_id=api_card_id).first()
-                    if existing:
-                        skipped += 1
-                        continue
-
-                    card = Card(
-                        api_card_id=api_card_id,
-                        name=card_data.get('name', ''),
-                        set_name=card_data.get('set', {}).get('name', ''),
-                        image_url_small=card_data.get('images', {}).get('small', ''),
-                        image_url_large=card_data.get('images', {}).get('large', ''),
-                        price=100,
-                        last_price_update=None
-                    )
-                    db.session.add(card)
-                    imported += 1
-
-                db.session.commit()
-                pokemon_result['status'] = 'success'
-                pokemon_result['imported'] = imported
-                pokemon_result['skipped'] = skipped
-                results['imported'] += imported
-                results['skipped'] += skipped
-                break
-
-            except requests.exceptions.Timeout:
-                if attempt < 2:
-                    time.sleep(10 * (attempt + 1))
-                    continue
-                pokemon_result['status'] = 'timeout'
-                results['failed'] += 1
-                break
-            except requests.exceptions.HTTPError as e:
-                if e.response.status_code == 504:
-                    if attempt < 2:
-                        time.sleep(15 * (attempt + 1))
-                        continue
-                    pokemon_result['status'] = 'gateway_timeout'
-                    results['failed'] += 1
-                    break
-                elif e.response.status_code == 404:
-                    pokemon_result['status'] = 'not_found'
-                    break
-                else:
-                    pokemon_result['status'] = f'http_error_{e.response.status_code}'
-                    results['failed'] += 1
-                    break
-            except Exception as e:
-                db.session.rollback()
-                pokemon_result['status'] = f'error: {str(e)[:50]}'
-                results['failed'] += 1
-                break
-
-        results['pokemon_processed'].append(pokemon_result)
-
-
-        time.sleep(2)
+@bp.route('/admin/import-jobs/<int:job_id>')
+@login_required
+@admin_required
+def import_job_status(job_id):
 
-    return jsonify({
-        'status': 'complete',
-        'results': results,
-        'message': f'Imported {results["imported"]} cards, skipped {results["skipped"]}, failed {results["failed"]}'
-    })
+    job = db.session.get(ImportJob, job_id)
+    if job is None:
+        abort(404)
+    return jsonify(job_status(job))
 
 @bp.route('/admin/clear-all-users', methods=['GET', 'POST'])
 @login_required
@@ -959,6 +908,8 @@ def clear_all_users():
     try:
 
 
+        TradeReservation.query.delete()
+        ImportJob.query.update({ImportJob.requested_by_id: None})
         OfferedCard.query.delete()
         RequestedCard.query.delete()
 
@@ -974,6 +925,7 @@ def clear_all_users():
 
 
         db.session.commit()
+        identity_cache.clear()
         flash('All users and their data have been deleted. You will be logged out.', 'info')
         logout_user()
         return redirect(url_for('main.index'))
@@ -1013,18 +965,8 @@ def purchase_card():
         db.session.flush()
 
 
-    base_price = initialize_card_price(card)
-
-
-    condition_multipliers = {
-        'Near Mint': 1.0,
-        'Lightly Played': 0.8,
-        'Moderately Played': 0.64,
-        'Heavily Played': 0.512,
-        'Damaged': 0.4096
-    }
-    multiplier = condition_multipliers.get(condition, 1.0)
-    card_price = max(1, int(base_price * multiplier))
+    base_price = materialize_card_price(card)
+    card_price = calculate_condition_price(base_price, condition)
 
 
     if current_user.balance < card_price:
@@ -1053,6 +995,7 @@ def purchase_card():
     )
     db.session.add(collection_item)
     db.session.commit()
+    card_name_index.add([card.name])
 
     flash(f'{card_name} purchased for {card_price} PokeDollars! Your balance: {current_user.balance} PD', 'success')
     return redirect(url_for('main.dashboard'))
@@ -1085,20 +1028,15 @@ def sell_card(item_id):
     card = item.card_info
 
 
-    pending_offered = OfferedCard.query.join(Trade).filter(
-        OfferedCard.collection_item_id == item.id,
-        Trade.status == TradeStatus.PENDING
-    ).first()
-    pending_requested = RequestedCard.query.join(Trade).filter(
-        RequestedCard.collection_item_id == item.id,
-        Trade.status == TradeStatus.PENDING
-    ).first()
-    if pending_offered or pending_requested:
+    if is_item_reserved(item.id):
         flash('This card is already part of a pending trade. Cancel the trade before selling.', 'danger')
         return redirect(url_for('main.dashboard'))
 
 
-    current_value = item.current_price or calculate_condition_price(item.card_info.price, item.condition)
+    current_value = calculate_condition_price(
+        card_price(card.name, card.set_name),
+        item.condition
+    )
 
 
     sell_price = max(1, current_value // 2)
@@ -1125,6 +1063,10 @@ def remove_card(item_id):
         flash('You do not have permission to remove this card.', 'danger')
         return redirect(url_for('main.dashboard'))
 
+    if is_item_reserved(item.id):
+        flash('This card is already part of a pending trade. Cancel the trade before removing it.', 'danger')
+        return redirect(url_for('main.dashboard'))
+
     card_name = item.card_info.name
     db.session.delete(item)
     db.session.commit()
@@ -1136,30 +1078,20 @@ def remove_card(item_id):
 @login_required
 def trades():
 
-    sent_trades = (
-        Trade.query
-        .filter(
-            Trade.proposer_id == current_user.id,
-            Trade.status == TradeStatus.PENDING
-        )
-        .order_by(Trade.created_at.desc())
-        .all()
-    )
+    sent_cursor = request.args.get('sent_before')
+    received_cursor = request.args.get('received_before')
 
-    received_trades = (
-        Trade.query
-        .filter(
-            Trade.receiver_id == current_user.id,
-            Trade.status == TradeStatus.PENDING
-        )
-        .order_by(Trade.created_at.desc())
-        .all()
-    )
+    sent_trades, sent_next = load_sent_trades(current_user.id, sent_cursor)
+    received_trades, received_next = load_received_trades(current_user.id, received_cursor)
 
     return render_template('trades.html',
                          title='My Trades',
                          sent_trades=sent_trades,
-                         received_trades=received_trades)
+                         received_trades=received_trades,
+                         sent_cursor=sent_cursor,
+                         received_cursor=received_cursor,
+                         sent_next=sent_next,
+                         received_next=received_next)
 
 @bp.route('/trades/propose/<username>', methods=['GET', 'POST'])
 @login_required
@@ -1218,15 +1150,7 @@ def propose_trade(username):
 
 
         all_card_ids = [item.id for item in offered_items + requested_items]
-        existing_offered = OfferedCard.query.join(Trade).filter(
-            OfferedCard.collection_item_id.in_(all_card_ids),
-            Trade.status == TradeStatus.PENDING
-        ).first()
-        existing_requested = RequestedCard.query.join(Trade).filter(
-            RequestedCard.collection_item_id.in_(all_card_ids),
-            Trade.status == TradeStatus.PENDING
-        ).first()
-        if existing_offered or existing_requested:
+        if reserved_item_ids(all_card_ids):
             flash('Some cards are already in a pending trade.', 'danger')
             return redirect(url_for('main.propose_trade', username=username))
 
@@ -1241,6 +1165,13 @@ def propose_trade(username):
         db.session.add(trade)
         db.session.flush()
 
+        try:
+            reserve_items(trade.id, all_card_ids)
+        except ItemsAlreadyReserved:
+            db.session.rollback()
+            flash('Some cards are already in a pending trade.', 'danger')
+            return redirect(url_for('main.propose_trade', username=username))
+
 
         if proposer_currency > 0:
             current_user.balance -= proposer_currency
@@ -1278,9 +1209,6 @@ def propose_trade(username):
         user_id=receiver.id
     ).all()
 
-
-    db.session.refresh(current_user)
-
     return render_template('propose_trade.html',
                          title=f'Propose Trade to {receiver.username}',
                          receiver=receiver,
@@ -1292,7 +1220,7 @@ def propose_trade(username):
 @login_required
 def accept_trade(trade_id):
 
-    trade = Trade.query.get_or_404(trade_id)
+    trade = load_trade_with_items(trade_id)
 
     if trade.receiver_id != current_user.id:
         flash('Only the receiving user can accept this trade. Make sure you are logged into the correct account.', 'danger')
@@ -1315,40 +1243,29 @@ def accept_trade(trade_id):
         return redirect(url_for('main.trades'))
 
 
-    for item in offered_items + requested_items:
-
-        other_offered = OfferedCard.query.join(Trade).filter(
-            OfferedCard.collection_item_id == item.id,
-            Trade.status == TradeStatus.PENDING,
-            Trade.id != trade.id
-        ).first()
-
-        other_requested = RequestedCard.query.join(Trade).filter(
-            RequestedCard.collection_item_id == item.id,
-            Trade.status == TradeStatus.PENDING,
-            Trade.id != trade.id
-        ).first()
-        if other_offered or other_requested:
-            flash('Some cards are already in another pending trade.', 'danger')
-            return redirect(url_for('main.trades'))
+    if reserved_item_ids((item.id for item in offered_items + requested_items), exclude_trade_id=trade.id):
+        flash('Some cards are already in another pending trade.', 'danger')
+        return redirect(url_for('main.trades'))
 
 
 
-    for item in offered_items:
-        item.user_id = trade.receiver_id
+    CollectionItem.query.filter(
+        CollectionItem.id.in_([item.id for item in offered_items])
+    ).update({CollectionItem.user_id: trade.receiver_id}, synchronize_session=False)
 
 
-    for item in requested_items:
-        item.user_id = trade.proposer_id
+    CollectionItem.query.filter(
+        CollectionItem.id.in_([item.id for item in requested_items])
+    ).update({CollectionItem.user_id: trade.proposer_id}, synchronize_session=False)
 
 
     if trade.proposer_currency > 0:
-        receiver_user = User.query.get(trade.receiver_id)
-        receiver_user.balance += trade.proposer_currency
+        current_user.balance += trade.proposer_currency
 
 
 
     trade.status = TradeStatus.ACCEPTED
+    release_trade_items(trade.id)
     db.session.commit()
 
     currency_msg = f" and {trade.proposer_currency} PokeDollars" if trade.proposer_currency > 0 else ""
@@ -1372,8 +1289,7 @@ def reject_trade(trade_id):
 
 
     if trade.proposer_currency > 0:
-        proposer_user = User.query.get(trade.proposer_id)
-        proposer_user.balance += trade.proposer_currency
+        credit_balance(trade.proposer_id, trade.proposer_currency)
 
 
     if current_user.id == trade.receiver_id:
@@ -1382,6 +1298,7 @@ def reject_trade(trade_id):
 
         trade.status = TradeStatus.CANCELLED
 
+    release_trade_items(trade.id)
     db.session.commit()
 
     if trade.status == TradeStatus.REJECTED:
@@ -1426,11 +1343,11 @@ def counter_trade(trade_id):
 
 
         if original_trade.proposer_currency > 0:
-            original_proposer = User.query.get(original_trade.proposer_id)
-            original_proposer.balance += original_trade.proposer_currency
+            credit_balance(original_trade.proposer_id, original_trade.proposer_currency)
 
 
         original_trade.status = TradeStatus.CANCELLED
+        release_trade_items(original_trade.id)
 
 
         counter_trade = Trade(
@@ -1475,6 +1392,13 @@ def counter_trade(trade_id):
             )
             db.session.add(requested_card)
 
+        try:
+            reserve_items(counter_trade.id, [item.id for item in offered_items + requested_items])
+        except ItemsAlreadyReserved:
+            db.session.rollback()
+            flash('Some cards are already in another pending trade.', 'danger')
+            return redirect(url_for('main.counter_trade', trade_id=trade_id))
+
         db.session.commit()
         flash('Counter-offer sent!', 'success')
         return redirect(url_for('main.trades'))
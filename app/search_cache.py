@@ -0,0 +1,399 @@
+# Tiered card-search cache with an in-process LRU/TTL tier in front of a bounded, compressed file tier
+# Python standard library
+
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+
+_MISSING = object()
+GENERATION_RECHECK_SECONDS = 1.0
+_KNOWN_MISS = object()
+
+
+class MemoryTier:
+
+    def __init__(self, max_entries=256, ttl_seconds=300, negative_ttl_seconds=30):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return _MISSING
+            value, expires_at = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.misses += 1
+                return _MISSING
+            self._entries.move_to_end(key)
+            if value is None:
+                self.negative_hits += 1
+            else:
+                self.hits += 1
+            return value
+
+    def peek(self, key):
+
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or entry[1] <= time.monotonic():
+            return _MISSING
+        return entry[0]
+
+    def put(self, key, value, ttl_seconds=None):
+
+        if ttl_seconds is None:
+            ttl_seconds = self.negative_ttl_seconds if value is None else self.ttl_seconds
+        if ttl_seconds <= 0:
+            return
+        expires_at = time.monotonic() + ttl_seconds
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def discard(self, key):
+
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+
+        with self._lock:
+            size = len(self._entries)
+        return {
+            'entries': size,
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'negative_hits': self.negative_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+        }
+
+
+def atomic_write(path, payload):
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+def file_entries(root, pattern):
+
+    entries = []
+    for path in Path(root).glob(pattern):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+    return entries
+
+def evict_to_budget(entries, max_bytes, fill=0.8):
+
+    entries = sorted(entries)
+    total = sum(size for _, size, _ in entries)
+    target = max_bytes * fill
+    evicted = 0
+    for _, size, path in entries:
+        if total <= target:
+            break
+        path.unlink(missing_ok=True)
+        total -= size
+        evicted += 1
+    return total, evicted
+
+def slim_card(card):
+
+    if not isinstance(card, dict):
+        return card
+    set_data = card.get('set') if isinstance(card.get('set'), dict) else {}
+    images = card.get('images') if isinstance(card.get('images'), dict) else {}
+    return {
+        'id': card.get('id'),
+        'name': card.get('name', ''),
+        'set': {'name': set_data.get('name', '')},
+        'images': {'small': images.get('small', ''), 'large': images.get('large', '')}
+    }
+
+
+class FileTier:
+
+    def __init__(self, cache_dir, max_age, max_bytes=64 * 1024 * 1024):
+        self.cache_dir = Path(cache_dir)
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+        self._generation = None
+        self._generation_mtime = None
+        self._generation_checked = None
+        self._generation_lock = threading.Lock()
+        self._bytes = None
+        self._lock = threading.Lock()
+
+    def _generation_file(self):
+
+        return self.cache_dir / 'GENERATION'
+
+    def generation(self, fresh=False):
+
+        now = time.monotonic()
+        checked_at = self._generation_checked
+        if not fresh and checked_at is not None and now - checked_at < GENERATION_RECHECK_SECONDS:
+            return self._generation or 0
+
+        with self._generation_lock:
+            checked_at = self._generation_checked
+            if not fresh and checked_at is not None and now - checked_at < GENERATION_RECHECK_SECONDS:
+                return self._generation or 0
+            try:
+                mtime = self._generation_file().stat().st_mtime_ns
+            except FileNotFoundError:
+                mtime = None
+            if mtime is not None and mtime != self._generation_mtime:
+                try:
+                    self._generation = int(self._generation_file().read_text().strip() or 0)
+                    self._generation_mtime = mtime
+                except (OSError, ValueError):
+                    pass
+            self._generation_checked = time.monotonic()
+            return self._generation or 0
+
+    def _generation_dir(self, generation=None):
+
+        return self.cache_dir / f'g{self.generation() if generation is None else generation}'
+
+    def path_for(self, key):
+
+        cache_key = hashlib.md5(key.encode()).hexdigest()
+        return self._generation_dir() / cache_key[:2] / f"{cache_key}.json.gz"
+
+    def get(self, key):
+
+        cache_file = self.path_for(key)
+        try:
+            with gzip.open(cache_file, 'rt', encoding='utf-8') as f:
+                data = json.load(f)
+            cache_time = datetime.fromisoformat(data['timestamp'])
+        except FileNotFoundError:
+            self.misses += 1
+            return None, None
+        except (OSError, EOFError, ValueError, KeyError, TypeError):
+            self.misses += 1
+            return None, None
+
+        if datetime.now() - cache_time >= self.max_age:
+            self.misses += 1
+            return None, None
+        try:
+            os.utime(cache_file)
+        except OSError:
+            pass
+        self.hits += 1
+        return data['cards'], cache_time
+
+    def cache_time(self, key):
+
+        try:
+            with gzip.open(self.path_for(key), 'rt', encoding='utf-8') as f:
+                return datetime.fromisoformat(json.load(f)['timestamp'])
+        except (OSError, EOFError, ValueError, KeyError, TypeError):
+            return None
+
+    def put(self, key, cards):
+
+        cache_file = self.path_for(key)
+        cache_time = datetime.now()
+        payload = gzip.compress(json.dumps({
+            'timestamp': cache_time.isoformat(),
+            'cards': cards
+        }, separators=(',', ':')).encode('utf-8'), compresslevel=6)
+        try:
+            atomic_write(cache_file, payload)
+        except OSError:
+            return cache_time
+        self.writes += 1
+
+        with self._lock:
+            if self._bytes is None:
+                self._bytes = self._scan_bytes()
+            else:
+                self._bytes += len(payload)
+            over_budget = self._bytes > self.max_bytes
+        if over_budget:
+            self.evict()
+        return cache_time
+
+    def _entries(self):
+
+        return file_entries(self._generation_dir(), '*/*.json.gz')
+
+    def _scan_bytes(self):
+
+        return sum(size for _, size, _ in self._entries())
+
+    def _remove_stale_generations(self):
+
+        current = self._generation_dir().name
+        for path in self.cache_dir.glob('g*'):
+            if path.is_dir() and path.name != current and path.name[1:].isdigit():
+                shutil.rmtree(path, ignore_errors=True)
+        for legacy_file in self.cache_dir.glob('*.json'):
+            if len(legacy_file.stem) == 32:
+                legacy_file.unlink(missing_ok=True)
+
+    def evict(self):
+
+        with self._lock:
+            self._remove_stale_generations()
+            self._bytes, evicted = evict_to_budget(self._entries(), self.max_bytes)
+            self.evictions += evicted
+
+    def clear(self):
+
+        with self._lock:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            generation = self.generation(fresh=True) + 1
+            atomic_write(self._generation_file(), str(generation).encode())
+            with self._generation_lock:
+                self._generation = generation
+                self._generation_mtime = None
+                self._generation_checked = time.monotonic()
+            self._bytes = 0
+
+    def stats(self):
+
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'writes': self.writes,
+            'evictions': self.evictions,
+            'generation': self.generation(),
+            'bytes': self._bytes,
+            'max_bytes': self.max_bytes
+        }
+
+
+class TieredCardCache:
+
+    def __init__(self, cache_dir, max_age, max_entries=256, memory_ttl_seconds=300,
+                 negative_ttl_seconds=30, max_bytes=64 * 1024 * 1024, soft_max_age=None):
+        self.memory = MemoryTier(max_entries, memory_ttl_seconds, negative_ttl_seconds)
+        self.files = FileTier(cache_dir, max_age, max_bytes)
+        self.soft_max_age = soft_max_age or max_age
+        self.stale_hits = 0
+
+    def _memory_key(self, key):
+
+        return self.files.generation(), key
+
+    def lookup(self, query):
+
+        key = query.lower()
+        memory_key = self._memory_key(key)
+        entry = self.memory.get(memory_key)
+        if entry is _MISSING:
+            cards, cache_time = self.files.get(key)
+            if cards is None:
+                self.memory.put(memory_key, None)
+                return None, False
+
+            entry = (cards, cache_time)
+            remaining = (cache_time + self.files.max_age - datetime.now()).total_seconds()
+            self.memory.put(memory_key, entry, min(self.memory.ttl_seconds, remaining))
+
+        if entry is None:
+            return None, False
+        if entry is _KNOWN_MISS:
+            return [], False
+        cards, cache_time = entry
+        stale = datetime.now() - cache_time >= self.soft_max_age
+        if stale:
+            self.stale_hits += 1
+        return cards, stale
+
+    def get(self, query):
+
+        return self.lookup(query)[0]
+
+    def age(self, query):
+
+        cache_time = self.files.cache_time(query.lower())
+        if cache_time is None:
+            return None
+        return datetime.now() - cache_time
+
+    def version(self, query):
+
+        key = query.lower()
+        entry = self.memory.peek(self._memory_key(key))
+        if entry is _KNOWN_MISS:
+            cache_time = None
+        elif entry not in (_MISSING, None):
+            cache_time = entry[1]
+        else:
+            cache_time = self.files.cache_time(key)
+        return self.files.generation(), cache_time
+
+    def put(self, query, cards):
+
+        key = query.lower()
+        cards = [slim_card(card) for card in cards]
+        cache_time = self.files.put(key, cards)
+        self.memory.put(self._memory_key(key), (cards, cache_time))
+
+    def remember_miss(self, query):
+
+        self.memory.put(self._memory_key(query.lower()), _KNOWN_MISS)
+
+    def clear(self):
+
+        self.memory.clear()
+        self.files.clear()
+
+    def stats(self):
+
+        return {
+            'memory': self.memory.stats(),
+            'file': self.files.stats(),
+            'stale_hits': self.stale_hits,
+            'soft_ttl_seconds': int(self.soft_max_age.total_seconds()),
+            'hard_ttl_seconds': int(self.files.max_age.total_seconds())
+        }
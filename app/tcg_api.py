@@ -0,0 +1,174 @@
+# Pokemon TCG API client with pooled sessions, concurrent queries, and request coalescing
+# requests, concurrent.futures, threading
+
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from app.rate_limit import TokenBucket
+
+TCG_API_URL = os.environ.get('POKEMON_TCG_API_URL', 'https://api.pokemontcg.io/v2')
+SEARCH_SELECT = 'id,name,set,images'
+SET_SELECT = 'id,name,total,updatedAt'
+CATALOG_PAGE_SIZE = 250
+NAME_SEARCH_TOKENS = 2
+
+_api_session = None
+_session_lock = threading.Lock()
+
+api_rate_limiter = TokenBucket(
+    os.environ.get(
+        'POKETRADER_RATE_LIMIT_DB',
+        Path(tempfile.gettempdir()) / 'poketrader_rate_limit.sqlite3'
+    ),
+    'pokemontcg',
+    capacity=float(os.environ.get('POKETRADER_API_BURST', 5)),
+    refill_rate=float(os.environ.get('POKETRADER_API_RATE', 1.0)),
+    max_tokens=NAME_SEARCH_TOKENS
+)
+
+_fetch_executor = ThreadPoolExecutor(
+    max_workers=int(os.environ.get('POKETRADER_API_FETCH_WORKERS', 8)),
+    thread_name_prefix='tcg-api'
+)
+
+def get_api_session():
+
+    global _api_session
+    with _session_lock:
+        if _api_session is None:
+            import requests
+
+            session = requests.Session()
+
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=10,
+                pool_maxsize=20,
+                max_retries=0
+            )
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+
+            session.headers.update({'Accept-Encoding': 'gzip, deflate'})
+            _api_session = session
+    return _api_session
+
+
+class RateLimitExceeded(Exception):
+    pass
+
+
+def api_headers():
+
+    api_key = os.environ.get('POKEMON_TCG_API_KEY')
+    return {'X-Api-Key': api_key} if api_key else {}
+
+def fetch_cards(query, page_size=20, timeout=30):
+
+    response = get_api_session().get(
+        f'{TCG_API_URL}/cards',
+        params={
+            'q': query,
+            'pageSize': page_size,
+            'select': SEARCH_SELECT,
+            'orderBy': '-set.releaseDate'
+        },
+        headers=api_headers(),
+        timeout=timeout
+    )
+    response.raise_for_status()
+    return response.json().get('data', []) or []
+
+def fetch_sets(timeout=60):
+
+    sets = []
+    page = 1
+    while True:
+        response = get_api_session().get(
+            f'{TCG_API_URL}/sets',
+            params={'page': page, 'pageSize': CATALOG_PAGE_SIZE, 'select': SET_SELECT},
+            headers=api_headers(),
+            timeout=timeout
+        )
+        response.raise_for_status()
+        body = response.json()
+        data = body.get('data', []) or []
+        sets.extend(data)
+        if not data or len(sets) >= body.get('totalCount', 0):
+            return sets
+        page += 1
+
+def fetch_set_cards_page(set_id, page, page_size=CATALOG_PAGE_SIZE, timeout=60):
+
+    response = get_api_session().get(
+        f'{TCG_API_URL}/cards',
+        params={
+            'q': f'set.id:{set_id}',
+            'page': page,
+            'pageSize': page_size,
+            'select': SEARCH_SELECT
+        },
+        headers=api_headers(),
+        timeout=timeout
+    )
+    response.raise_for_status()
+    body = response.json()
+    return body.get('data', []) or [], body.get('totalCount', 0)
+
+def fetch_name_search(search_for_api, is_simple_name, timeout=30):
+
+    prefix_future = _fetch_executor.submit(fetch_cards, f'name:{search_for_api}*', 20, timeout)
+    if not is_simple_name:
+        return list(prefix_future.result())
+
+    exact_future = _fetch_executor.submit(fetch_cards, f'name:"{search_for_api}"', 20, timeout)
+    cards = list(exact_future.result())
+    if len(cards) >= 5:
+        prefix_future.cancel()
+        return cards
+
+    existing_ids = {c.get('id') for c in cards}
+    for card in prefix_future.result():
+        if card.get('id') not in existing_ids:
+            cards.append(card)
+            existing_ids.add(card.get('id'))
+    return cards
+
+
+class SingleFlight:
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.shared = 0
+
+    def do(self, key, fn):
+
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = {'event': threading.Event(), 'result': None, 'error': None}
+                self._calls[key] = call
+                leader = True
+            else:
+                self.shared += 1
+                leader = False
+
+        if not leader:
+            call['event'].wait()
+            if call['error'] is not None:
+                raise call['error']
+            return call['result']
+
+        try:
+            call['result'] = fn()
+            return call['result']
+        except BaseException as e:
+            call['error'] = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call['event'].set()
@@ -0,0 +1,137 @@
+# Trade loading with eager-loaded cards and keyset pagination, plus pending-trade item reservations
+# Flask-SQLAlchemy, SQLAlchemy ORM
+
+from datetime import datetime
+
+from sqlalchemy import tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased, joinedload, selectinload
+
+from app import db
+from app.models import User, Trade, OfferedCard, RequestedCard, CollectionItem, TradeStatus, TradeReservation
+
+TRADES_PAGE_SIZE = 20
+
+def encode_trade_cursor(trade):
+
+    return f"{trade.created_at.isoformat()}_{trade.id}"
+
+def decode_trade_cursor(cursor):
+
+    if not cursor:
+        return None
+    try:
+        created_at, trade_id = cursor.rsplit('_', 1)
+        return datetime.fromisoformat(created_at), int(trade_id)
+    except ValueError:
+        return None
+
+def _trade_with_cards():
+
+    return Trade.query.options(
+        joinedload(Trade.proposer),
+        joinedload(Trade.receiver),
+        selectinload(Trade.offered_cards)
+            .joinedload(OfferedCard.collection_item)
+            .joinedload(CollectionItem.card_info),
+        selectinload(Trade.requested_cards)
+            .joinedload(RequestedCard.collection_item)
+            .joinedload(CollectionItem.card_info),
+    )
+
+def load_trade_with_items(trade_id):
+
+    return (
+        Trade.query
+        .options(
+            selectinload(Trade.offered_cards).joinedload(OfferedCard.collection_item),
+            selectinload(Trade.requested_cards).joinedload(RequestedCard.collection_item),
+        )
+        .filter(Trade.id == trade_id)
+        .first_or_404()
+    )
+
+def trade_page_query(user_column, user_id, cursor=None, page_size=TRADES_PAGE_SIZE):
+
+    query = _trade_with_cards().filter(
+        user_column == user_id,
+        Trade.status == TradeStatus.PENDING
+    )
+
+    position = decode_trade_cursor(cursor)
+    if position is not None:
+        created_at, trade_id = position
+        anchor = aliased(Trade)
+        stored_created_at = db.select(anchor.created_at).where(anchor.id == trade_id).scalar_subquery()
+        query = query.filter(
+            tuple_(Trade.created_at, Trade.id) < tuple_(db.func.coalesce(stored_created_at, created_at), trade_id)
+        )
+
+    return (
+        query
+        .order_by(Trade.created_at.desc(), Trade.id.desc())
+        .limit(page_size + 1)
+    )
+
+def load_trade_page(user_column, user_id, cursor=None, page_size=TRADES_PAGE_SIZE):
+
+    trades = trade_page_query(user_column, user_id, cursor, page_size).all()
+
+    next_cursor = None
+    if len(trades) > page_size:
+        trades = trades[:page_size]
+        next_cursor = encode_trade_cursor(trades[-1])
+    return trades, next_cursor
+
+def load_sent_trades(user_id, cursor=None, page_size=TRADES_PAGE_SIZE):
+
+    return load_trade_page(Trade.proposer_id, user_id, cursor, page_size)
+
+def load_received_trades(user_id, cursor=None, page_size=TRADES_PAGE_SIZE):
+
+    return load_trade_page(Trade.receiver_id, user_id, cursor, page_size)
+
+class ItemsAlreadyReserved(Exception):
+    pass
+
+def reserved_item_ids(item_ids, exclude_trade_id=None):
+
+    item_ids = list(item_ids)
+    if not item_ids:
+        return set()
+    query = db.session.query(TradeReservation.collection_item_id).filter(
+        TradeReservation.collection_item_id.in_(item_ids)
+    )
+    if exclude_trade_id is not None:
+        query = query.filter(TradeReservation.trade_id != exclude_trade_id)
+    return {row[0] for row in query.all()}
+
+def is_item_reserved(item_id):
+
+    return db.session.get(TradeReservation, item_id) is not None
+
+def reserve_items(trade_id, item_ids):
+
+    item_ids = list(item_ids)
+    if not item_ids:
+        return
+    try:
+        with db.session.begin_nested():
+            db.session.execute(
+                db.insert(TradeReservation),
+                [{'collection_item_id': item_id, 'trade_id': trade_id} for item_id in item_ids]
+            )
+    except IntegrityError:
+        raise ItemsAlreadyReserved(item_ids)
+
+def release_trade_items(trade_id):
+
+    db.session.query(TradeReservation).filter(
+        TradeReservation.trade_id == trade_id
+    ).delete(synchronize_session=False)
+
+def credit_balance(user_id, amount):
+
+    User.query.filter(User.id == user_id).update(
+        {User.balance: User.balance + amount}, synchronize_session=False
+    )
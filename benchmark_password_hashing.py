@@ -0,0 +1,79 @@
+# Micro-benchmark reporting bcrypt login throughput per core at each work factor through the app's hashing executor
+# Flask-Bcrypt, threading, argparse
+
+import argparse
+import os
+import sys
+import threading
+import time
+
+from config import Config
+from app import create_app
+from app.passwords import hash_password, verify_password, HASH_WORKERS
+
+PASSWORD = 'correct horse battery staple'
+
+
+class BenchmarkConfig(Config):
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+
+def run_logins(password_hash, seconds, threads):
+    latencies = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + seconds
+
+    def worker():
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            verify_password(password_hash, PASSWORD)
+            elapsed = time.perf_counter() - started
+            with lock:
+                latencies.append(elapsed)
+
+    started = time.perf_counter()
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'logins': len(latencies),
+        'per_second': len(latencies) / elapsed,
+        'p50_ms': latencies[len(latencies) // 2] * 1000 if latencies else 0.0,
+        'max_ms': latencies[-1] * 1000 if latencies else 0.0
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure bcrypt logins/sec per core at each work factor.')
+    parser.add_argument('--costs', nargs='+', type=int, default=[10, 11, 12, 13], help='bcrypt log rounds to measure')
+    parser.add_argument('--seconds', type=float, default=3.0, help='measurement time per cost')
+    parser.add_argument('--threads', type=int, default=None, help='concurrent login threads (default: hashing workers)')
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    threads = args.threads or HASH_WORKERS
+    app = create_app(BenchmarkConfig)
+    configured = app.config['BCRYPT_LOG_ROUNDS']
+
+    print(f'🚀 Benchmarking bcrypt with {threads} threads on {cores} cores ({HASH_WORKERS} hashing workers)')
+    print(f'{"cost":>6} {"logins/s":>10} {"per core":>10} {"p50 ms":>9} {"max ms":>9}')
+    with app.app_context():
+        for cost in args.costs:
+            if cost < 4 or cost > 31:
+                print(f'❌ Cost {cost} is outside bcrypt\'s 4-31 range')
+                return 1
+            password_hash = hash_password(PASSWORD, rounds=cost)
+            result = run_logins(password_hash, args.seconds, threads)
+            busy_cores = min(cores, threads, HASH_WORKERS)
+            marker = '  ← BCRYPT_LOG_ROUNDS' if cost == configured else ''
+            print(f'{cost:>6} {result["per_second"]:>10.1f} {result["per_second"] / busy_cores:>10.1f} '
+                  f'{result["p50_ms"]:>9.1f} {result["max_ms"]:>9.1f}{marker}')
+
+    print('\n💡 Each +1 cost doubles hashing time; raise BCRYPT_LOG_ROUNDS only while logins/s per core covers peak sign-in load.')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
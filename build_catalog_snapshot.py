@@ -0,0 +1,49 @@
+# Script to generate the compact instant-search catalog snapshot from the Card table or import dumps
+# Flask, Flask-SQLAlchemy
+
+import argparse
+import json
+import sys
+
+from app import create_app, db
+from app.models import Card
+from app.precached_pokemon import snapshot_path, write_snapshot
+
+def cards_from_db(names=None):
+    query = Card.query.order_by(Card.name, Card.id)
+    if names:
+        query = query.filter(db.func.lower(Card.name).in_([name.lower() for name in names]))
+    for card in query.yield_per(1000):
+        yield {
+            'id': card.api_card_id,
+            'name': card.name,
+            'set': {'name': card.set_name},
+            'images': {'small': card.image_url_small, 'large': card.image_url_large}
+        }
+
+def cards_from_json(paths):
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = data.get('data') or data.get('cards') or []
+        yield from data
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate the catalog snapshot used for instant card search.')
+    parser.add_argument('--from-json', nargs='+', metavar='FILE', help='read upstream card lists (import run output) instead of the Card table')
+    parser.add_argument('--names', nargs='+', metavar='NAME', help='only include cards with these exact names when reading the Card table')
+    parser.add_argument('--output', default=None, help=f'snapshot file to write (default: {snapshot_path()})')
+    args = parser.parse_args()
+
+    if args.from_json:
+        count = write_snapshot(cards_from_json(args.from_json), args.output)
+    else:
+        app = create_app()
+        with app.app_context():
+            count = write_snapshot(cards_from_db(args.names), args.output)
+    print(f'✅ Wrote {count} cards to {args.output or snapshot_path()}')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,111 +1,61 @@
 # Script to bulk import Pokemon cards from TCG API into database
 # Flask, Flask-SQLAlchemy, requests
 
-from app import create_app, db
-from app.models import Card
-import requests
+import argparse
 import os
-import time
-from datetime import date
+import sys
+from pathlib import Path
+
+from app import create_app
+from app.card_import import run_import, ImportCheckpoint, IMPORT_WORKERS, IMPORT_BATCH_SIZE
 app = create_app()
 POKEMON_LIST = ['Pikachu', 'Charizard', 'Blastoise', 'Venusaur', 'Mewtwo', 'Mew', 'Lucario', 'Garchomp', 'Gengar', 'Snorlax', 'Dragonite', 'Tyranitar', 'Rayquaza', 'Groudon', 'Kyogre', 'Dialga', 'Palkia', 'Giratina', 'Arceus', 'Zekrom', 'Reshiram', 'Kyurem', 'Xerneas', 'Yveltal', 'Zygarde', 'Solgaleo', 'Lunala', 'Necrozma', 'Eternatus', 'Zacian', 'Zamazenta', 'Urshifu', 'Calyrex', 'Koraidon', 'Miraidon', 'Ogerpon', 'Bulbasaur', 'Charmander', 'Squirtle', 'Eevee', 'Jigglypuff', 'Meowth', 'Psyduck', 'Machop', 'Abra', 'Magikarp', 'Gyarados', 'Lapras', 'Ditto', 'Vaporeon', 'Jolteon', 'Flareon', 'Aerodactyl', 'Snorlax']
+DEFAULT_CHECKPOINT = Path(os.environ.get('POKETRADER_CACHE_DIR', 'cache')) / 'bulk_import_checkpoint.json'
 
-def get_api_session():
-    print(f'  Importing {pokemon_name}...', end=' ', flush=True)
-    for attempt in range(max_retries):
-        try:
-            response = session.get('https://api.pokemontcg.io/v2/cards', params={'q': f'name:"{pokemon_name}"', 'pageSize': max_cards, 'select': 'id,name,set,images'}, timeout=60)
-            if response.status_code != 200:
-                response = session.get('https://api.pokemontcg.io/v2/cards', params={'q': f'name:{pokemon_name}*', 'pageSize': max_cards, 'select': 'id,name,set,images'}, timeout=60)
-            if response.status_code == 504:
-                raise requests.exceptions.HTTPError(f'504 Gateway Timeout', response=response)
-            response.raise_for_status()
-            data = response.json()
-            cards = data.get('data', [])
-            imported = 0
-            skipped = 0
-            for card_data in cards:
-                api_card_id = card_data.get('id')
-                if not api_card_id:
-                    continue
-                existing = Card.query.filter_by(api_card_id=api_card_id).first()
-                if existing:
-                    skipped += 1
-                    continue
-                card = Card(api_card_id=api_card_id, name=card_data.get('name', ''), set_name=card_data.get('set', {}).get('name', ''), image_url_small=card_data.get('images', {}).get('small', ''), image_url_large=card_data.get('images', {}).get('large', ''), price=100, last_price_update=None)
-                db.session.add(card)
-                imported += 1
-            db.session.commit()
-            print(f'✅ {imported} imported, {skipped} skipped')
-            return imported
-        except requests.exceptions.Timeout:
-            if attempt < max_retries - 1:
-                wait_time = (attempt + 1) * 5
-                print(f'⏳ Timeout (attempt {attempt + 1}/{max_retries}), waiting {wait_time}s...', end=' ', flush=True)
-                time.sleep(wait_time)
-                continue
-            else:
-                db.session.rollback()
-                print(f'❌ Timeout after {max_retries} attempts')
-                return 0
-        except requests.exceptions.HTTPError as e:
-            if e.response.status_code == 504:
-                if attempt < max_retries - 1:
-                    wait_time = (attempt + 1) * 10
-                    print(f'⏳ Gateway timeout (attempt {attempt + 1}/{max_retries}), waiting {wait_time}s...', end=' ', flush=True)
-                    time.sleep(wait_time)
-                    continue
-                else:
-                    db.session.rollback()
-                    print(f'❌ Gateway timeout after {max_retries} attempts')
-                    return 0
-            elif e.response.status_code == 404:
-                db.session.rollback()
-                print(f'⚠️  No cards found (404)')
-                return 0
-            elif attempt < max_retries - 1:
-                wait_time = (attempt + 1) * 5
-                print(f'⚠️  HTTP {e.response.status_code} (attempt {attempt + 1}/{max_retries}), waiting {wait_time}s...', end=' ', flush=True)
-                time.sleep(wait_time)
-                continue
-            else:
-                db.session.rollback()
-                print(f'❌ HTTP {e.response.status_code} after {max_retries} attempts')
-                return 0
-        except requests.exceptions.ConnectionError as e:
-            if attempt < max_retries - 1:
-                wait_time = (attempt + 1) * 5
-                print(f'🔌 Connection error (attempt {attempt + 1}/{max_retries}), waiting {wait_time}s...', end=' ', flush=True)
-                time.sleep(wait_time)
-                continue
-            else:
-                db.session.rollback()
-                print(f'❌ Connection failed after {max_retries} attempts')
-                return 0
-        except Exception as e:
-            db.session.rollback()
-            error_msg = str(e)
-            if len(error_msg) > 80:
-                error_msg = error_msg[:77] + '...'
-            print(f'❌ Error: {error_msg}')
-            return 0
-    return 0
+def print_result(result):
+    name = result['name']
+    status = result['status']
+    if status == 'success':
+        print(f'  ✅ {name}: {result["imported"]} imported, {result["skipped"]} skipped')
+    elif status == 'not_found':
+        print(f'  ⚠️  {name}: no cards found')
+    else:
+        print(f'  ❌ {name}: {status}')
 
 def main():
+    parser = argparse.ArgumentParser(description='Bulk import Pokemon cards from the TCG API.')
+    parser.add_argument('--names', nargs='+', metavar='NAME', help='Pokemon to import (default: built-in list)')
+    parser.add_argument('--max-cards', type=int, default=10, help='cards to import per Pokemon')
+    parser.add_argument('--workers', type=int, default=IMPORT_WORKERS, help='concurrent upstream fetches')
+    parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE, help='cards per INSERT batch')
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT, help='file recording Pokemon already imported')
+    parser.add_argument('--restart', action='store_true', help='ignore the checkpoint and import every Pokemon again')
+    args = parser.parse_args()
+
+    names = args.names or POKEMON_LIST
+    checkpoint = ImportCheckpoint(args.checkpoint)
+    if args.restart:
+        checkpoint.clear()
+
     with app.app_context():
         print('🚀 Starting bulk card import...')
-        print(f'📋 Will import up to 10 cards each for {len(POKEMON_LIST)} Pokemon')
-        print('⏳ This may take a few minutes...\n')
-        session = get_api_session()
-        total_imported = 0
-        for i, pokemon in enumerate(POKEMON_LIST, 1):
-            print(f'[{i}/{len(POKEMON_LIST)}] ', end='')
-            imported = import_pokemon_cards(pokemon, session)
-            total_imported += imported
-            if i < len(POKEMON_LIST):
-                time.sleep(2.0)
+        print(f'📋 Will import up to {args.max_cards} cards each for {len(names)} Pokemon with {args.workers} workers')
+        report = run_import(
+            names,
+            max_cards=args.max_cards,
+            workers=args.workers,
+            batch_size=args.batch_size,
+            checkpoint=checkpoint,
+            log=print_result
+        )
+        latency = report['latency_ms']
         print(f'\n✅ Import complete!')
-        print(f'📊 Total cards imported: {total_imported}')
-        print(f'💡 Cards are now in your database and searches will be much faster!')
+        if report['resumed']:
+            print(f'⏭️  {report["resumed"]} Pokemon already imported by an earlier run (use --restart to redo them)')
+        print(f'📊 {report["imported"]} imported, {report["skipped"]} already present, {report["failed"]} failed')
+        print(f'⚡ {report["cards_per_second"]} cards/s over {report["seconds"]}s, {report["requests"]} API requests')
+        print(f'⏱️  Upstream latency p50 {latency["p50"]}ms, p90 {latency["p90"]}ms, p99 {latency["p99"]}ms, max {latency["max"]}ms')
+        return 1 if report['failed'] else 0
+
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    sys.exit(main())
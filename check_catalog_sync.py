@@ -0,0 +1,168 @@
+# Catalog-mirror regression check syncing from a local stand-in API through partial, failed, resumed and full runs
+# Flask, Flask-SQLAlchemy, http.server
+
+import json
+import os
+import sys
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+
+os.environ.setdefault('POKETRADER_RATE_LIMIT_DB', os.path.join(tempfile.mkdtemp(prefix='poketrader_sync_'), 'limits.sqlite3'))
+
+from config import Config
+from app import create_app, db, tcg_api
+from app.catalog import sync_catalog, catalog_mirror_complete, invalidate_mirror_status
+from app.catalog_dump import import_dump
+from app.models import Card, CatalogSet
+from app.rate_limit import TokenBucket
+from app.tcg_api import CATALOG_PAGE_SIZE
+
+SETS = {'base1': 3, 'jungle': CATALOG_PAGE_SIZE * 2 + 10, 'fossil': 5}
+UPDATED_AT = '2024/01/01 00:00:00'
+REQUESTS = []
+FAILING_PAGES = set()
+
+
+class CheckConfig(Config):
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    WTF_CSRF_ENABLED = False
+
+def set_cards(set_id):
+    return [
+        {
+            'id': f'{set_id}-{number}',
+            'name': f'{set_id.title()} Card {number}',
+            'set': {'id': set_id, 'name': set_id.title()},
+            'images': {'small': f'https://images.example/{set_id}/{number}.png'}
+        }
+        for number in range(1, SETS[set_id] + 1)
+    ]
+
+
+class StandInAPI(BaseHTTPRequestHandler):
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        REQUESTS.append((url.path, params.get('q'), params.get('page')))
+
+        if url.path.endswith('/sets'):
+            data = [{'id': set_id, 'name': set_id.title(), 'total': total, 'updatedAt': UPDATED_AT} for set_id, total in SETS.items()]
+            body = {'data': data, 'page': 1, 'pageSize': len(data), 'count': len(data), 'totalCount': len(data)}
+        elif url.path.endswith('/cards'):
+            set_id = (params.get('q') or '').replace('set.id:', '')
+            page = int(params.get('page', 1))
+            if (set_id, page) in FAILING_PAGES:
+                self.send_response(503)
+                self.end_headers()
+                return
+            size = int(params.get('pageSize', CATALOG_PAGE_SIZE))
+            cards = set_cards(set_id) if set_id in SETS else []
+            data = cards[(page - 1) * size:page * size]
+            body = {'data': data, 'page': page, 'pageSize': size, 'count': len(data), 'totalCount': len(cards)}
+        else:
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+def start_api():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandInAPI)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f'http://127.0.0.1:{server.server_address[1]}/v2'
+
+def write_dump(set_id):
+    root = Path(tempfile.mkdtemp(prefix='poketrader_dump_'))
+    (root / 'cards' / 'en').mkdir(parents=True)
+    (root / 'sets').mkdir()
+    (root / 'cards' / 'en' / f'{set_id}.json').write_text(json.dumps(set_cards(set_id)))
+    (root / 'sets' / 'en.json').write_text(json.dumps([{'id': set_id, 'name': set_id.title(), 'total': SETS[set_id], 'updatedAt': UPDATED_AT}]))
+    return root
+
+def reset():
+    Card.query.delete()
+    CatalogSet.query.delete()
+    db.session.commit()
+    invalidate_mirror_status()
+
+def main():
+    tcg_api.TCG_API_URL = start_api()
+    app = create_app(CheckConfig)
+    limiter = TokenBucket(os.environ['POKETRADER_RATE_LIMIT_DB'], 'catalog-check', capacity=1000, refill_rate=1000)
+    failures = []
+
+    def check(name, ok):
+        print(f'{"✅" if ok else "❌"} {name}')
+        if not ok:
+            failures.append(name)
+
+    def sync(**kwargs):
+        del REQUESTS[:]
+        report = sync_catalog(limiter=limiter, acquire_timeout=5, **kwargs)
+        return report, len(REQUESTS)
+
+    print(f'🚀 Checking the catalog sync against {tcg_api.TCG_API_URL}')
+    with app.app_context():
+        db.create_all()
+        total_cards = sum(SETS.values())
+
+        report, _ = sync(set_ids=['base1'])
+        check('--sets syncs only the listed sets', report['sets_synced'] == 1 and Card.query.count() == SETS['base1'])
+        check('a --sets sync never marks the mirror complete', not catalog_mirror_complete())
+
+        reset()
+        import_dump(write_dump('fossil'))
+        invalidate_mirror_status()
+        check('a dump import checkpoints its sets', db.session.get(CatalogSet, 'fossil').complete)
+        check('a dump import never marks the mirror complete', not catalog_mirror_complete())
+
+        reset()
+        FAILING_PAGES.add(('jungle', 2))
+        report, _ = sync()
+        jungle = db.session.get(CatalogSet, 'jungle')
+        check('a failed page stops only its set', report['sets_failed'] == 1 and report['sets_synced'] == 2)
+        check('the failed set keeps its page checkpoint', jungle.pages_synced == 1 and not jungle.complete)
+        check('a failed sync leaves the mirror incomplete', not catalog_mirror_complete())
+
+        FAILING_PAGES.clear()
+        report, requests = sync()
+        jungle_pages = [page for path, q, page in REQUESTS if q == 'set.id:jungle']
+        check('resume refetches only the missing pages', jungle_pages == ['2', '3'] and requests == 3)
+        check('every card is mirrored once', Card.query.count() == total_cards)
+        check('a full sync marks the mirror complete', catalog_mirror_complete())
+
+        report, requests = sync()
+        check('an unchanged catalog costs one listing request', report['sets_skipped'] == len(SETS) and requests == 1)
+
+        SETS['neo'] = 2
+        FAILING_PAGES.add(('neo', 1))
+        sync()
+        check('a new upstream set reopens the mirror until it syncs', not catalog_mirror_complete())
+        FAILING_PAGES.clear()
+        sync()
+        check('the new set completes the mirror again', catalog_mirror_complete())
+
+        del SETS['neo']
+        sync()
+        check('sets dropped upstream no longer count', catalog_mirror_complete() and not db.session.get(CatalogSet, 'neo').listed)
+
+    if failures:
+        print(f'\n❌ {len(failures)} catalog sync checks failed')
+        return 1
+    print('\n✅ Catalog sync behaves as expected')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,125 @@
+# Image-proxy regression check serving card images from a local stand-in origin through the /img route
+# Flask, http.server, Pillow (optional)
+
+import base64
+import os
+import struct
+import sys
+import tempfile
+import threading
+import zlib
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from pathlib import Path
+
+os.environ['POKETRADER_IMAGE_HOSTS'] = '127.0.0.1'
+os.environ['POKETRADER_CACHE_DIR'] = tempfile.mkdtemp(prefix='poketrader_images_')
+
+from config import Config
+from app import create_app
+from app.image_proxy import CardImageStore, _image_module
+
+ORIGIN_HITS = []
+
+
+class ImageCheckConfig(Config):
+    SQLALCHEMY_DATABASE_URI = 'sqlite://'
+    WTF_CSRF_ENABLED = False
+
+def sample_png(width=600, height=840):
+    row = b'\x00' + b'\xcc\x22\x22' * width
+    raw = zlib.compress(row * height)
+
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header) + chunk(b'IDAT', raw) + chunk(b'IEND', b'')
+
+PNG = sample_png()
+
+
+class StandInOrigin(BaseHTTPRequestHandler):
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        ORIGIN_HITS.append(self.path)
+        if self.path.startswith('/missing'):
+            self.send_response(404)
+            self.end_headers()
+            return
+        payload = PNG + self.path.encode('utf-8') if self.path.startswith('/set/') else PNG
+        self.send_response(200)
+        self.send_header('Content-Type', 'image/png')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+def start_origin():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StandInOrigin)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f'http://127.0.0.1:{server.server_address[1]}'
+
+def main():
+    origin = start_origin()
+    app = create_app(ImageCheckConfig)
+    client = app.test_client()
+    resizing = _image_module() is not None
+    failures = []
+
+    def check(name, ok):
+        print(f'{"✅" if ok else "❌"} {name}')
+        if not ok:
+            failures.append(name)
+
+    print(f'🚀 Checking the image proxy against {origin} (resizing {"on" if resizing else "off"})')
+    with app.test_request_context():
+        from app.routes import card_image_url
+        image_path = card_image_url(f'{origin}/base1/58.png')
+        missing_path = card_image_url(f'{origin}/missing.png')
+        foreign_path = card_image_url('https://example.com/base1/58.png')
+
+    check('template filter rewrites allowed hosts to /img', image_path.startswith('/img/sm/'))
+    check('template filter leaves other hosts alone', foreign_path == 'https://example.com/base1/58.png')
+
+    first = client.get(image_path)
+    second = client.get(image_path)
+    check('image is served', first.status_code == 200 and second.status_code == 200)
+    check('origin is fetched once', len(ORIGIN_HITS) == 1)
+
+    cache_control = first.headers.get('Cache-Control', '')
+    if resizing:
+        check('thumbnail is WebP', first.mimetype == 'image/webp' and len(first.data) < len(PNG))
+        check('thumbnail is cached immutably', 'immutable' in cache_control and 'max-age=31536000' in cache_control)
+    else:
+        check('original served without Pillow', first.mimetype == 'image/png')
+        check('unresized fallback is not immutable', 'immutable' not in cache_control)
+
+    revalidated = client.get(image_path, headers={'If-None-Match': first.headers['ETag']})
+    check('revalidation returns 304', revalidated.status_code == 304)
+
+    original = client.get(image_path.replace('/img/sm/', '/img/original/'))
+    check('original size serves the origin bytes', original.data == PNG and len(ORIGIN_HITS) == 1)
+
+    token = base64.urlsafe_b64encode(b'https://example.com/x.png').decode('ascii').rstrip('=')
+    check('tokens for other hosts are rejected', client.get(f'/img/sm/{token}').status_code == 404)
+    check('unknown sizes are rejected', client.get(image_path.replace('/img/sm/', '/img/huge/')).status_code == 404)
+
+    unavailable = client.get(missing_path)
+    check('origin failures redirect to the origin', unavailable.status_code == 302 and unavailable.location.endswith('/missing.png'))
+
+    store = CardImageStore(Path(tempfile.mkdtemp()), ['127.0.0.1'], max_bytes=len(PNG) * 2)
+    for number in range(4):
+        store.variant(f'{origin}/set/{number}.png', 'original')
+    stats = store.stats()
+    check('image cache stays within its byte budget', stats['evictions'] > 0 and stats['bytes'] <= store.max_bytes)
+
+    if failures:
+        print(f'\n❌ {len(failures)} image proxy checks failed')
+        return 1
+    print('\n✅ Image proxy behaves as expected')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
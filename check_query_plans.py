@@ -0,0 +1,142 @@
+# Query-plan regression check that fails if a hot route query falls back to a sequential scan
+# Flask, Flask-SQLAlchemy, Flask-Migrate, SQLAlchemy
+
+import os
+import re
+import sys
+from datetime import datetime
+
+from flask_migrate import stamp, upgrade
+from sqlalchemy import event
+
+from config import Config
+from app import create_app, db
+from app.models import User, Card, CollectionItem, Trade, OfferedCard, RequestedCard, TradeStatus, TradeReservation
+from app.trades import encode_trade_cursor, reserved_item_ids
+
+PASSWORD = 'query-plans'
+
+
+class QueryPlanConfig(Config):
+    SQLALCHEMY_DATABASE_URI = os.environ.get('QUERY_PLAN_DATABASE_URL', 'sqlite://')
+    WTF_CSRF_ENABLED = False
+    BCRYPT_LOG_ROUNDS = 4
+    LAZY_INIT = False
+
+app = create_app(QueryPlanConfig)
+
+def seed():
+    alice = User(username='alice', email='alice@example.com', balance=1000)
+    bob = User(username='bob', email='bob@example.com', balance=1000)
+    alice.set_password(PASSWORD)
+    bob.set_password(PASSWORD)
+    db.session.add_all([alice, bob])
+    cards = [Card(api_card_id=f'seed-{i}', name=f'Pikachu {i}', set_name='Seed', price=100) for i in range(50)]
+    db.session.add_all(cards)
+    db.session.flush()
+    items = [CollectionItem(user_id=(alice.id if i % 2 else bob.id), card_id=card.id, purchase_price=10, current_price=10) for i, card in enumerate(cards)]
+    db.session.add_all(items)
+    db.session.flush()
+    trade = Trade(proposer_id=alice.id, receiver_id=bob.id, status=TradeStatus.PENDING, created_at=datetime(2024, 1, 1))
+    db.session.add(trade)
+    db.session.flush()
+    db.session.add(OfferedCard(trade_id=trade.id, collection_item_id=items[1].id, offering_user_id=alice.id))
+    db.session.add(RequestedCard(trade_id=trade.id, collection_item_id=items[0].id, requesting_user_id=alice.id))
+    db.session.add(TradeReservation(collection_item_id=items[1].id, trade_id=trade.id))
+    db.session.commit()
+    return {'trade_id': trade.id, 'cursor': encode_trade_cursor(trade), 'item_ids': [items[0].id, items[1].id]}
+
+def hot_paths(client, seeded):
+    from app.routes import _search_local_catalog
+
+    def local_catalog_search():
+        with app.test_request_context():
+            _search_local_catalog('Pika')
+
+    def reservation_check():
+        with app.app_context():
+            reserved_item_ids(seeded['item_ids'], exclude_trade_id=seeded['trade_id'])
+
+    return {
+        'login': lambda: client.post('/auth/login', data={'email': 'alice@example.com', 'password': PASSWORD}),
+        'dashboard': lambda: client.get('/dashboard'),
+        'user profile': lambda: client.get('/user/bob'),
+        'trades': lambda: client.get('/trades'),
+        'trades next page': lambda: client.get(f'/trades?sent_before={seeded["cursor"]}&received_before={seeded["cursor"]}'),
+        'trade details': lambda: client.get(f'/trades/{seeded["trade_id"]}'),
+        'propose trade form': lambda: client.get('/trades/propose/bob'),
+        'purchase': lambda: client.post('/cards/purchase', data={'api_card_id': 'seed-1', 'card_name': 'Pikachu 1'}),
+        'sell reserved item': lambda: client.post(f'/cards/{seeded["item_ids"][1]}/sell'),
+        'local catalog search': local_catalog_search,
+        'reserved items': reservation_check,
+    }
+
+def capture(run):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith('SELECT') and not executemany:
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    try:
+        run()
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', record)
+    return list(dict.fromkeys((statement, tuple(parameters) if isinstance(parameters, (list, tuple)) else tuple(sorted(parameters.items()))) for statement, parameters in statements))
+
+def explain(connection, statement, parameters):
+    dialect = connection.dialect
+    parameters = tuple(parameters) if dialect.name == 'sqlite' else dict(parameters)
+    if dialect.name == 'sqlite':
+        rows = connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters).fetchall()
+        plan = [row[-1] for row in rows]
+        scans = [line for line in plan if re.match(r'SCAN (?!CONSTANT ROW)\S+$', line)]
+    else:
+        rows = connection.exec_driver_sql(f'EXPLAIN {statement}', parameters).fetchall()
+        plan = [row[0] for row in rows]
+        scans = [line for line in plan if 'Seq Scan' in line]
+    return plan, scans
+
+def main():
+    with app.app_context():
+        if db.engine.dialect.name == 'sqlite':
+            db.create_all()
+            stamp()
+        else:
+            upgrade()
+        seeded = seed()
+
+    client = app.test_client()
+    failures = 0
+    with app.app_context():
+        connection = db.engine.connect()
+        if connection.dialect.name == 'postgresql':
+            connection.exec_driver_sql('SET enable_seqscan = off')
+
+        for name, run in hot_paths(client, seeded).items():
+            statements = capture(run)
+            scanning = []
+            for statement, parameters in statements:
+                plan, scans = explain(connection, statement, parameters)
+                if scans:
+                    scanning.append((statement, plan))
+            if scanning:
+                failures += 1
+                print(f'❌ {name}: sequential scan')
+                for statement, plan in scanning:
+                    print(f'      {" ".join(statement.split())}')
+                    for line in plan:
+                        print(f'        {line}')
+            else:
+                print(f'✅ {name} ({len(statements)} queries)')
+        connection.close()
+
+    if failures:
+        print(f'\n{failures} hot paths fall back to a sequential scan')
+        return 1
+    print('\nAll hot queries use an index')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
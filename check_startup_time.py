@@ -0,0 +1,94 @@
+# Cold-start regression check timing the serverless entry point import per module and failing on slow or eager startups
+# subprocess, argparse, python -X importtime
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+ENTRY_MODULE = 'api.index'
+DEFERRED_MODULES = ['requests', 'urllib3', 'PIL', 'flask_migrate', 'alembic']
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)$')
+
+def measure_once(lazy):
+    env = dict(os.environ)
+    env.setdefault('DATABASE_URL', 'sqlite://')
+    env.setdefault('SECRET_KEY', 'startup-check')
+    env['POKETRADER_LAZY_INIT'] = '1' if lazy else '0'
+
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {ENTRY_MODULE}'],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    wall = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else 'import failed')
+
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            modules[match.group(4)] = (int(match.group(1)) / 1000, int(match.group(2)) / 1000)
+    return wall * 1000, modules
+
+def self_time_by_package(modules):
+    totals = defaultdict(float)
+    for name, (self_ms, _) in modules.items():
+        key = name if name.startswith('app.') or name.startswith('api.') else name.split('.')[0]
+        totals[key] += self_ms
+    return totals
+
+def main():
+    parser = argparse.ArgumentParser(description=f'Measure the cold-start import time of {ENTRY_MODULE}.')
+    parser.add_argument('--runs', type=int, default=5, help='fresh interpreters to measure')
+    parser.add_argument('--budget-ms', type=float, default=float(os.environ.get('POKETRADER_STARTUP_BUDGET_MS', 1500)),
+                        help='fail if the median entry-point import exceeds this')
+    parser.add_argument('--top', type=int, default=15, help='packages to list by import time')
+    parser.add_argument('--eager', action='store_true', help='measure without POKETRADER_LAZY_INIT')
+    args = parser.parse_args()
+
+    lazy = not args.eager
+    print(f'🚀 Importing {ENTRY_MODULE} in {args.runs} fresh interpreters ({"lazy" if lazy else "eager"} init)...')
+    runs = []
+    for _ in range(max(1, args.runs)):
+        try:
+            runs.append(measure_once(lazy))
+        except RuntimeError as e:
+            print(f'❌ {ENTRY_MODULE} failed to import: {e}')
+            return 1
+
+    entry_ms = [modules.get(ENTRY_MODULE, (0.0, 0.0))[1] for _, modules in runs]
+    median_entry = statistics.median(entry_ms)
+    median_wall = statistics.median(wall for wall, _ in runs)
+    median_run = runs[entry_ms.index(sorted(entry_ms)[len(entry_ms) // 2])][1]
+
+    print(f'\n{"self ms":>9}  package')
+    totals = self_time_by_package(median_run)
+    for name, self_ms in sorted(totals.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f'{self_ms:>9.1f}  {name}')
+
+    print(f'\n📊 {ENTRY_MODULE} import: median {median_entry:.0f} ms (min {min(entry_ms):.0f}, max {max(entry_ms):.0f}), '
+          f'process wall time {median_wall:.0f} ms, {len(median_run)} modules')
+
+    failed = False
+    eager = [name for name in DEFERRED_MODULES if name in median_run]
+    if lazy and eager:
+        print(f'❌ Deferred modules imported at startup: {", ".join(eager)}')
+        failed = True
+    if median_entry > args.budget_ms:
+        print(f'❌ Cold start {median_entry:.0f} ms exceeds the {args.budget_ms:.0f} ms budget')
+        failed = True
+    if failed:
+        return 1
+
+    print(f'✅ Cold start within the {args.budget_ms:.0f} ms budget')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,80 @@
+# Keyset-pagination regression check paging through trades that share a creation second without duplicates or gaps
+# Flask-SQLAlchemy, SQLAlchemy
+
+import os
+import sys
+from datetime import datetime, timedelta
+
+from config import Config
+from app import create_app, db
+from app.models import User, Trade, TradeStatus
+from app.trades import load_sent_trades, load_received_trades
+
+PAGE_SIZE = 4
+
+
+class PaginationCheckConfig(Config):
+    SQLALCHEMY_DATABASE_URI = os.environ.get('PAGINATION_DATABASE_URL', 'sqlite://')
+    LAZY_INIT = False
+
+def seed():
+    alice = User(username='alice', email='alice@example.com', password_hash='-', balance=0)
+    bob = User(username='bob', email='bob@example.com', password_hash='-', balance=0)
+    db.session.add_all([alice, bob])
+    db.session.flush()
+
+    same_second = [Trade(proposer_id=alice.id, receiver_id=bob.id, status=TradeStatus.PENDING) for _ in range(11)]
+    db.session.add_all(same_second)
+    db.session.flush()
+    stamped = datetime.now().replace(microsecond=0)
+    spread = [
+        Trade(proposer_id=alice.id, receiver_id=bob.id, status=TradeStatus.PENDING, created_at=stamped - timedelta(seconds=offset, microseconds=250))
+        for offset in (1, 1, 2, 3)
+    ]
+    closed = Trade(proposer_id=alice.id, receiver_id=bob.id, status=TradeStatus.ACCEPTED)
+    db.session.add_all(spread + [closed])
+    db.session.commit()
+    expected = {trade.id for trade in same_second + spread}
+    return alice.id, bob.id, expected
+
+def page_through(load, user_id):
+    seen = []
+    cursor = None
+    pages = 0
+    while True:
+        trades, cursor = load(user_id, cursor=cursor, page_size=PAGE_SIZE)
+        pages += 1
+        seen.extend(trade.id for trade in trades)
+        if cursor is None or pages > 50:
+            return seen, pages
+
+def main():
+    app = create_app(PaginationCheckConfig)
+    failures = []
+
+    def check(name, ok):
+        print(f'{"✅" if ok else "❌"} {name}')
+        if not ok:
+            failures.append(name)
+
+    with app.app_context():
+        db.create_all()
+        alice_id, bob_id, expected = seed()
+        ordered = [trade.id for trade in Trade.query.filter(Trade.id.in_(expected)).order_by(Trade.created_at.desc(), Trade.id.desc())]
+
+        print(f'🚀 Paging {len(expected)} pending trades, 11 created in the same second, {PAGE_SIZE} per page')
+        for label, load, user_id in (('sent', load_sent_trades, alice_id), ('received', load_received_trades, bob_id)):
+            seen, pages = page_through(load, user_id)
+            check(f'{label}: no trade appears twice', len(seen) == len(set(seen)))
+            check(f'{label}: every pending trade appears', set(seen) == expected)
+            check(f'{label}: pages keep newest-first order', seen == ordered)
+            check(f'{label}: {pages} pages for {len(expected)} trades', pages == -(-len(expected) // PAGE_SIZE))
+
+    if failures:
+        print(f'\n❌ {len(failures)} pagination checks failed')
+        return 1
+    print('\n✅ Trade pagination has no duplicates or gaps')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,7 +2,8 @@
 # Flask, Flask-SQLAlchemy
 
 from app import create_app, db
-from app.models import User, CollectionItem, Trade, OfferedCard, RequestedCard
+from app.models import User, CollectionItem, Trade, OfferedCard, RequestedCard, TradeReservation, ImportJob
+from app.identity import identity_cache
 app = create_app()
 with app.app_context():
     print('⚠️  WARNING: This will delete ALL users and their data!')
@@ -10,6 +11,8 @@ with app.app_context():
     if response == 'DELETE ALL':
         try:
             print('Deleting trade cards...')
+            TradeReservation.query.delete()
+            ImportJob.query.update({ImportJob.requested_by_id: None})
             OfferedCard.query.delete()
             RequestedCard.query.delete()
             print('Deleting trades...')
@@ -20,6 +23,7 @@ with app.app_context():
             user_count = User.query.count()
             User.query.delete()
             db.session.commit()
+            identity_cache.clear()
             print(f'✅ Successfully deleted {user_count} users and all related data!')
         except Exception as e:
             db.session.rollback()
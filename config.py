@@ -2,6 +2,7 @@
 # python-dotenv, os
 
 import os
+import tempfile
 from dotenv import load_dotenv
 
 basedir = os.path.abspath(os.path.dirname(__file__))
@@ -22,5 +23,12 @@ class Config:
         
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    BCRYPT_LOG_ROUNDS = int(os.environ.get('BCRYPT_LOG_ROUNDS', 12))
+
+    LAZY_INIT = os.environ.get('POKETRADER_LAZY_INIT', '1' if os.environ.get('VERCEL') else '').lower() in ('1', 'true', 'yes')
+    JINJA_CACHE_DIR = os.environ.get(
+        'POKETRADER_JINJA_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'poketrader_jinja')
+    )
+
     WTF_CSRF_ENABLED = True
     WTF_CSRF_TIME_LIMIT = 3600
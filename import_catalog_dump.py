@@ -0,0 +1,36 @@
+# Script to populate the Card table from local pokemon-tcg-data JSON dumps without touching the API
+# Flask, Flask-SQLAlchemy
+
+import argparse
+import sys
+
+from app import create_app, db
+from app.catalog_dump import import_dump, DUMP_BATCH_SIZE
+from app.models import Card
+
+def main():
+    parser = argparse.ArgumentParser(description='Import cards from a pokemon-tcg-data checkout or a directory of card JSON files.')
+    parser.add_argument('path', help='pokemon-tcg-data checkout, cards/<lang> directory, or a single set file')
+    parser.add_argument('--language', default='en', help='dump language directory to read')
+    parser.add_argument('--batch-size', type=int, default=DUMP_BATCH_SIZE, help='cards per upsert batch')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        print(f'🚀 Importing card dumps from {args.path}...')
+        try:
+            report = import_dump(args.path, args.language, args.batch_size, log=lambda message: print(f'  {message}'))
+        except (OSError, ValueError) as e:
+            db.session.rollback()
+            print(f'❌ Import failed: {e}')
+            return 1
+        if not report['files']:
+            print('⚠️  No card files found')
+            return 1
+        print(f'\n✅ {report["cards"]} cards from {report["files"]} files ({report["upserted"]} upserted)')
+        print(f'⚡ {report["cards_per_second"]} cards/s over {report["seconds"]}s')
+        print(f'📦 {Card.query.count()} cards in the local catalog, {report["sets_checkpointed"]} sets marked as synced')
+        return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
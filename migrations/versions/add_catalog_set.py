@@ -0,0 +1,15 @@
+# Add per-set checkpoint table for the incremental catalog mirror sync
+# Alembic, SQLAlchemy
+
+from alembic import op
+import sqlalchemy as sa
+revision = 'add_catalog_set'
+down_revision = 'add_hot_lookup_indexes'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('catalog_set', sa.Column('id', sa.String(length=50), nullable=False), sa.Column('name', sa.String(length=100), nullable=True), sa.Column('total', sa.Integer(), nullable=False, server_default='0'), sa.Column('upstream_updated_at', sa.String(length=30), nullable=True), sa.Column('pages_synced', sa.Integer(), nullable=False, server_default='0'), sa.Column('cards_synced', sa.Integer(), nullable=False, server_default='0'), sa.Column('complete', sa.Boolean(), nullable=False, server_default=sa.false()), sa.Column('synced_at', sa.DateTime(), nullable=True), sa.PrimaryKeyConstraint('id'))
+
+def downgrade():
+    op.drop_table('catalog_set')
@@ -0,0 +1,15 @@
+# Mark catalog sets seen in the last full upstream listing so partial syncs never count as a complete mirror
+# Alembic, SQLAlchemy
+
+from alembic import op
+import sqlalchemy as sa
+revision = 'add_catalog_set_listed'
+down_revision = 'add_import_job'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column('catalog_set', sa.Column('listed', sa.Boolean(), nullable=False, server_default=sa.false()))
+
+def downgrade():
+    op.drop_column('catalog_set', 'listed')
@@ -0,0 +1,34 @@
+# Add secondary indexes for collection, trade, and card-name prefix lookups
+# Alembic, SQLAlchemy
+
+from alembic import op
+import sqlalchemy as sa
+revision = 'add_hot_lookup_indexes'
+down_revision = 'add_trade_reservation'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_index('ix_collection_item_user_id', 'collection_item', ['user_id'])
+    op.create_index('ix_collection_item_card_id', 'collection_item', ['card_id'])
+    op.create_index('ix_trade_proposer_id_status', 'trade', ['proposer_id', 'status', 'created_at'])
+    op.create_index('ix_trade_receiver_id_status', 'trade', ['receiver_id', 'status', 'created_at'])
+    op.create_index('ix_offered_card_trade_id', 'offered_card', ['trade_id'])
+    op.create_index('ix_offered_card_collection_item_id', 'offered_card', ['collection_item_id'])
+    op.create_index('ix_requested_card_trade_id', 'requested_card', ['trade_id'])
+    op.create_index('ix_requested_card_collection_item_id', 'requested_card', ['collection_item_id'])
+    if op.get_bind().dialect.name == 'postgresql':
+        op.create_index('ix_card_name_lower', 'card', [sa.text('lower(name) varchar_pattern_ops')])
+    else:
+        op.create_index('ix_card_name_lower', 'card', [sa.text('lower(name)')])
+
+def downgrade():
+    op.drop_index('ix_card_name_lower', table_name='card')
+    op.drop_index('ix_requested_card_collection_item_id', table_name='requested_card')
+    op.drop_index('ix_requested_card_trade_id', table_name='requested_card')
+    op.drop_index('ix_offered_card_collection_item_id', table_name='offered_card')
+    op.drop_index('ix_offered_card_trade_id', table_name='offered_card')
+    op.drop_index('ix_trade_receiver_id_status', table_name='trade')
+    op.drop_index('ix_trade_proposer_id_status', table_name='trade')
+    op.drop_index('ix_collection_item_card_id', table_name='collection_item')
+    op.drop_index('ix_collection_item_user_id', table_name='collection_item')
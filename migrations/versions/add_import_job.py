@@ -0,0 +1,17 @@
+# Add import job table so bulk card imports run in the background with pollable progress
+# Alembic, SQLAlchemy
+
+from alembic import op
+import sqlalchemy as sa
+revision = 'add_import_job'
+down_revision = 'add_catalog_set'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('import_job', sa.Column('id', sa.Integer(), nullable=False), sa.Column('requested_by_id', sa.Integer(), nullable=True), sa.Column('status', sa.String(length=20), nullable=False, server_default='queued'), sa.Column('pokemon_list', sa.JSON(), nullable=False), sa.Column('max_cards', sa.Integer(), nullable=False, server_default='10'), sa.Column('processed', sa.Integer(), nullable=False, server_default='0'), sa.Column('imported', sa.Integer(), nullable=False, server_default='0'), sa.Column('skipped', sa.Integer(), nullable=False, server_default='0'), sa.Column('failed', sa.Integer(), nullable=False, server_default='0'), sa.Column('results', sa.JSON(), nullable=True), sa.Column('report', sa.JSON(), nullable=True), sa.Column('error', sa.Text(), nullable=True), sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True), sa.Column('started_at', sa.DateTime(), nullable=True), sa.Column('finished_at', sa.DateTime(), nullable=True), sa.ForeignKeyConstraint(['requested_by_id'], ['user.id']), sa.PrimaryKeyConstraint('id'))
+    op.create_index('ix_import_job_status', 'import_job', ['status'])
+
+def downgrade():
+    op.drop_index('ix_import_job_status', table_name='import_job')
+    op.drop_table('import_job')
@@ -0,0 +1,17 @@
+# Add claim token and heartbeat to import jobs so only one worker across processes runs or resumes a job
+# Alembic, SQLAlchemy
+
+from alembic import op
+import sqlalchemy as sa
+revision = 'add_import_job_claim'
+down_revision = 'add_catalog_set_listed'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column('import_job', sa.Column('claimed_by', sa.String(length=32), nullable=True))
+    op.add_column('import_job', sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+
+def downgrade():
+    op.drop_column('import_job', 'heartbeat_at')
+    op.drop_column('import_job', 'claimed_by')
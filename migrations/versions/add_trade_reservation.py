@@ -0,0 +1,34 @@
+# Add reservation table so each collection item can be held by at most one pending trade
+# Alembic, SQLAlchemy
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.sql import table, column, select
+revision = 'add_trade_reservation'
+down_revision = 'add_coll_item_current_price'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table('trade_reservation', sa.Column('collection_item_id', sa.Integer(), nullable=False), sa.Column('trade_id', sa.Integer(), nullable=False), sa.ForeignKeyConstraint(['collection_item_id'], ['collection_item.id']), sa.ForeignKeyConstraint(['trade_id'], ['trade.id']), sa.PrimaryKeyConstraint('collection_item_id'))
+    op.create_index('ix_trade_reservation_trade_id', 'trade_reservation', ['trade_id'])
+    bind = op.get_bind()
+    trade = table('trade', column('id', sa.Integer), column('status', sa.String))
+    offered_card = table('offered_card', column('trade_id', sa.Integer), column('collection_item_id', sa.Integer))
+    requested_card = table('requested_card', column('trade_id', sa.Integer), column('collection_item_id', sa.Integer))
+    trade_reservation = table('trade_reservation', column('collection_item_id', sa.Integer), column('trade_id', sa.Integer))
+    pending = []
+    for link in (offered_card, requested_card):
+        pending.extend(bind.execute(select(link.c.trade_id, link.c.collection_item_id).select_from(link.join(trade, link.c.trade_id == trade.c.id)).where(trade.c.status == 'PENDING')).fetchall())
+    reserved = set()
+    rows = []
+    for trade_id, collection_item_id in sorted(pending):
+        if collection_item_id not in reserved:
+            reserved.add(collection_item_id)
+            rows.append({'collection_item_id': collection_item_id, 'trade_id': trade_id})
+    if rows:
+        op.bulk_insert(trade_reservation, rows)
+
+def downgrade():
+    op.drop_index('ix_trade_reservation_trade_id', table_name='trade_reservation')
+    op.drop_table('trade_reservation')
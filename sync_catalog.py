@@ -0,0 +1,44 @@
+# Script to mirror the full upstream card catalog into the Card table set by set with resumable checkpoints
+# Flask, Flask-SQLAlchemy, requests
+
+import argparse
+import sys
+
+from app import create_app, db
+from app import tcg_api
+from app.catalog import sync_catalog, catalog_mirror_complete
+from app.models import Card, CatalogSet
+
+def main():
+    parser = argparse.ArgumentParser(description='Mirror the Pokemon TCG catalog into the local Card table.')
+    parser.add_argument('--full', action='store_true', help='refetch every set even if its checkpoint is current')
+    parser.add_argument('--sets', nargs='+', metavar='SET_ID', help='only sync these set ids')
+    parser.add_argument('--api-url', default=None, help=f'upstream API base URL (default: {tcg_api.TCG_API_URL})')
+    args = parser.parse_args()
+
+    if args.api_url:
+        tcg_api.TCG_API_URL = args.api_url.rstrip('/')
+
+    app = create_app()
+    with app.app_context():
+        print(f'🚀 Syncing catalog from {tcg_api.TCG_API_URL}...')
+        try:
+            report = sync_catalog(full=args.full, set_ids=args.sets, log=lambda message: print(f'  {message}'))
+        except Exception as e:
+            db.session.rollback()
+            print(f'❌ Could not list upstream sets: {e}')
+            return 1
+
+        print(f'\n✅ {report["sets_synced"]} sets synced, {report["sets_skipped"]} unchanged, {report["sets_failed"]} failed')
+        print(f'📊 {report["cards_upserted"]} cards upserted in {report["requests"]} API requests')
+        print(f'📦 {Card.query.count()} cards across {CatalogSet.query.count()} sets in the local catalog')
+        if catalog_mirror_complete():
+            print('💡 Mirror is complete; set POKETRADER_LOCAL_CATALOG_SEARCH=1 to answer searches locally.')
+        elif args.sets:
+            print('⏳ Only the listed sets were synced; run without --sets to mirror every upstream set.')
+        else:
+            print('⏳ Mirror is incomplete; rerun to resume from the last checkpoint.')
+        return 1 if report['sets_failed'] else 0
+
+if __name__ == '__main__':
+    sys.exit(main())